@@ -0,0 +1,91 @@
+"""Hostel, room and booking tables
+
+Revision ID: 5f3c1a9e7b21
+Revises: d2b2d85040e8
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f3c1a9e7b21'
+down_revision: Union[str, None] = 'd2b2d85040e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # products/feedbacks were never used by main.py
+    op.drop_table('feedbacks')
+    op.drop_table('products')
+
+    op.create_table(
+        'hostels',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('location', sa.String(length=255), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_hostels_name'), 'hostels', ['name'], unique=False)
+
+    op.create_table(
+        'rooms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('hostel_id', sa.Integer(), nullable=False),
+        sa.Column('number', sa.String(length=50), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('available', sa.Boolean(), nullable=False),
+        sa.Column('room_type', sa.String(length=50), nullable=True),
+        sa.Column('price', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['hostel_id'], ['hostels.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rooms_hostel_id'), 'rooms', ['hostel_id'], unique=False)
+
+    op.create_table(
+        'bookings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('guest_name', sa.String(length=255), nullable=False),
+        sa.Column('guest_email', sa.String(length=255), nullable=False),
+        sa.Column('check_in_date', sa.DateTime(), nullable=False),
+        sa.Column('check_out_date', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_bookings_room_id'), 'bookings', ['room_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_bookings_room_id'), table_name='bookings')
+    op.drop_table('bookings')
+    op.drop_index(op.f('ix_rooms_hostel_id'), table_name='rooms')
+    op.drop_table('rooms')
+    op.drop_index(op.f('ix_hostels_name'), table_name='hostels')
+    op.drop_table('hostels')
+
+    op.create_table(
+        'products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('owner_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table(
+        'feedbacks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('customer_name', sa.String(length=255), nullable=False),
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=True),
+        sa.Column('product_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
@@ -0,0 +1,37 @@
+"""Id sequences
+
+Revision ID: 8a4d2e6f0c13
+Revises: 5f3c1a9e7b21
+Create Date: 2026-10-18 11:02:17.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4d2e6f0c13'
+down_revision: Union[str, None] = '5f3c1a9e7b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'id_sequences',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    # Start each sequence after the highest existing id
+    for table in ('users', 'hostels', 'rooms', 'bookings'):
+        op.execute(
+            f"INSERT INTO id_sequences (name, value) "
+            f"SELECT '{table}', COALESCE(MAX(id), 0) FROM {table}"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('id_sequences')
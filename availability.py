@@ -0,0 +1,49 @@
+import bisect
+from datetime import datetime, timezone
+
+
+def as_naive_utc(value):
+    """Parse ISO strings and drop timezones (converting to UTC) so dates compare."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class IntervalIndex:
+    """
+    Booked [check_in, check_out) intervals per room, kept sorted by start.
+
+    Bookings of one room never overlap, so the ends are sorted too and an
+    overlap check only has to look at the interval starting just before the
+    requested end: O(log n) per room.
+    """
+
+    def __init__(self):
+        self._starts = {}
+        self._ends = {}
+
+    def add(self, room_id, start, end):
+        starts = self._starts.setdefault(room_id, [])
+        ends = self._ends.setdefault(room_id, [])
+        i = bisect.bisect_right(starts, start)
+        starts.insert(i, start)
+        ends.insert(i, end)
+
+    def remove(self, room_id, start, end):
+        starts = self._starts.get(room_id, [])
+        ends = self._ends.get(room_id, [])
+        for i in range(bisect.bisect_left(starts, start), len(starts)):
+            if starts[i] != start:
+                break
+            if ends[i] == end:
+                del starts[i], ends[i]
+                return
+
+    def is_free(self, room_id, start, end):
+        starts = self._starts.get(room_id)
+        if not starts:
+            return True
+        i = bisect.bisect_left(starts, end)
+        return i == 0 or self._ends[room_id][i - 1] <= start
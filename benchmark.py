@@ -0,0 +1,239 @@
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+import httpx
+import numpy as np
+from gendata import generate_hostels, generate_rooms
+
+# Replays benchmarks/trace.jsonl against main.py and datanalysis.py in-process
+# (ASGI, no network) on a generated dataset, reports latency percentiles and
+# throughput per endpoint, and compares them with benchmarks/baseline.json.
+#
+#   python benchmark.py --dataset medium             # run and report
+#   python benchmark.py --dataset medium --check     # exit 1 on a regression
+#   python benchmark.py --dataset medium --save-baseline
+
+DATASETS = {  # name -> (hostels, rooms)
+    "small": (10, 100),
+    "medium": (200, 10_000),
+    "large": (10_000, 500_000),
+}
+BOOKED_FRACTION = 0.1  # Share of seeded rooms with one booking
+SEARCH_WORDS = ("group", "llc", "and", "smith", "lake", "port", "north")
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+TRACE_PATH = os.path.join(BENCH_DIR, "trace.jsonl")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+TOLERANCE = 0.5  # Allowed relative slowdown before --check fails
+MIN_SLACK_MS = 5.0  # ...but never less than this much on a percentile
+CHECKED_PERCENTILES = ("p50_ms",)  # p95/p99 are reported, but come from too few samples to gate on
+
+
+def seed_snapshot(path, num_hostels, num_rooms, seed=0):
+    """Write a database.json with generated hostels, rooms and some bookings, and a CSV of the rooms."""
+    rooms_per_hostel = np.full(num_hostels, num_rooms // num_hostels)
+    rooms_per_hostel[:num_rooms % num_hostels] += 1
+    hostels = generate_hostels(1, num_hostels, seed)
+    rooms = generate_rooms(1, list(range(1, num_hostels + 1)), rooms_per_hostel.tolist(), seed + 1)
+
+    rng = np.random.default_rng(seed + 2)
+    booked = rng.choice(num_rooms, int(num_rooms * BOOKED_FRACTION), replace=False) + 1
+    start = datetime(2025, 1, 1, 14)
+    bookings = []
+    for i, room_id in enumerate(booked.tolist()):
+        check_in = start + timedelta(days=int(rng.integers(0, 365)))
+        bookings.append({
+            "id": i + 1, "room_id": room_id, "guest_name": f"Seeded Guest {i}",
+            "guest_email": f"seeded{i}@example.com", "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=int(rng.integers(1, 8)), hours=-4)).isoformat(),
+        })
+    with open(path, "w") as f:
+        json.dump({"users": [], "hostels": hostels, "rooms": rooms, "bookings": bookings}, f)
+
+    # /eda-summary/ plots room types and revenue from static/ml.csv
+    os.makedirs(os.path.join(os.path.dirname(path), "static"), exist_ok=True)
+    with open(os.path.join(os.path.dirname(path), "static", "ml.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["room_id", "hostel_id", "room_type", "revenue"])
+        writer.writerows((r["id"], r["hostel_id"], r["room_type"], r["price"]) for r in rooms)
+    return {"hostels": num_hostels, "rooms": num_rooms, "bookings": len(bookings)}
+
+
+def load_trace(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def fill(value, context):
+    """Substitute ``{name}`` placeholders; a value that is just one placeholder keeps its type."""
+    if isinstance(value, str):
+        if value.startswith("{") and value.endswith("}") and value[1:-1] in context:
+            return context[value[1:-1]]
+        return value.format(**context)
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    return value
+
+def make_context(n, counts, rng):
+    # New bookings get their own future dates, so they never conflict
+    check_in = datetime(2030, 1, 1, 14) + timedelta(days=3 * n)
+    return {
+        "n": n,
+        "hostel_id": rng.randint(1, counts["hostels"]),
+        "room_id": rng.randint(1, counts["rooms"]),
+        "booking_id": rng.randint(1, max(counts["bookings"], 1)),
+        "check_in": check_in.isoformat(),
+        "check_out": (check_in + timedelta(days=2, hours=-4)).isoformat(),
+        "word": rng.choice(SEARCH_WORDS),
+    }
+
+
+async def replay(clients, requests, concurrency):
+    """Send ``(entry, context)`` pairs with ``concurrency`` workers; return samples and wall time."""
+    queue = asyncio.Queue()
+    for item in requests:
+        queue.put_nowait(item)
+    samples = []
+
+    async def worker():
+        while not queue.empty():
+            entry, context = queue.get_nowait()
+            client = clients[entry.get("app", "main")]
+            started = time.perf_counter()
+            response = await client.request(
+                entry["method"], fill(entry["path"], context),
+                params=fill(entry.get("params"), context), json=fill(entry.get("json"), context),
+            )
+            await response.aread()
+            samples.append((f"{entry['method']} {entry['path']}", time.perf_counter() - started, response.status_code))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+def summarize(samples, elapsed):
+    by_endpoint = {}
+    for endpoint, seconds, status in samples:
+        by_endpoint.setdefault(endpoint, []).append((seconds, status))
+    report = {}
+    for endpoint, rows in sorted(by_endpoint.items()):
+        latencies = np.array([seconds for seconds, _ in rows]) * 1000
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        report[endpoint] = {
+            "requests": len(rows),
+            "errors": sum(status >= 500 for _, status in rows),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "throughput_rps": round(len(rows) / elapsed, 1),
+        }
+    return report
+
+def print_report(report, elapsed, total):
+    print(f"{'endpoint':<34}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for endpoint, r in report.items():
+        print(f"{endpoint:<34}{r['requests']:>6}{r['errors']:>5}{r['p50_ms']:>10.2f}"
+              f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['throughput_rps']:>10.1f}")
+    print(f"{total} requests in {elapsed:.2f}s ({total / elapsed:,.0f} req/s)")
+
+def regressions(report, baseline, tolerance=TOLERANCE):
+    found = []
+    for endpoint, base in baseline.items():
+        current = report.get(endpoint)
+        if current is None:
+            continue
+        for key in CHECKED_PERCENTILES:
+            limit = max(base[key] * (1 + tolerance), base[key] + MIN_SLACK_MS)
+            if current[key] > limit:
+                found.append(f"{endpoint}: {key} {current[key]:.2f} > {limit:.2f} (baseline {base[key]:.2f})")
+        if current["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            found.append(f"{endpoint}: throughput {current['throughput_rps']} < baseline {base['throughput_rps']}")
+        if current["errors"] > base["errors"]:
+            found.append(f"{endpoint}: {current['errors']} server errors (baseline {base['errors']})")
+    return found
+
+
+def run(args):
+    trace = load_trace(args.trace)
+    workdir = tempfile.mkdtemp(prefix="hostel-bench-")
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        # The apps read their configuration and relative paths at import time
+        counts = seed_snapshot(os.path.join(workdir, "database.json"), *DATASETS[args.dataset], seed=args.seed)
+        os.chdir(workdir)
+        os.environ["DB_FILE"] = "database.json"
+        sys.path.insert(0, repo_dir)
+        started = time.perf_counter()
+        import main
+        import datanalysis
+        print(f"Dataset {args.dataset}: {counts} loaded in {time.perf_counter() - started:.2f}s")
+
+        rng = random.Random(args.seed)
+        contexts = (make_context(n, counts, rng) for n in range(args.warmup + len(trace) * args.repeat))
+        requests = [(trace[i % len(trace)], next(contexts)) for i in range(args.warmup + len(trace) * args.repeat)]
+
+        async def go():
+            transports = {"main": main.app, "datanalysis": datanalysis.app}
+            clients = {name: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+                       for name, app in transports.items()}
+            try:
+                await replay(clients, requests[:args.warmup], args.concurrency)
+                return await replay(clients, requests[args.warmup:], args.concurrency)
+            finally:
+                for client in clients.values():
+                    await client.aclose()
+
+        try:
+            samples, elapsed = asyncio.run(go())
+        finally:
+            main.close_store()
+            datanalysis.shutdown_eda_jobs()
+    finally:
+        os.chdir(repo_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = summarize(samples, elapsed)
+    print_report(report, elapsed, len(samples))
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    if args.save_baseline:
+        baselines[args.dataset] = report
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline for {args.dataset} saved to {args.baseline}")
+    elif args.check:
+        if args.dataset not in baselines:
+            print(f"No baseline for {args.dataset} in {args.baseline}")
+            return 1
+        found = regressions(report, baselines[args.dataset], args.tolerance)
+        for line in found:
+            print("REGRESSION", line)
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a request trace against the API in-process")
+    parser.add_argument("--dataset", choices=DATASETS, default="small", help="size of the seeded data")
+    parser.add_argument("--trace", default=TRACE_PATH, help="JSONL request templates, replayed in order")
+    parser.add_argument("--repeat", type=int, default=20, help="passes over the trace")
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests sent first")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for data and placeholders")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="stored results to compare with")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="allowed relative slowdown")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any endpoint regressed")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    sys.exit(run(parser.parse_args()))
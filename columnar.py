@@ -0,0 +1,88 @@
+import json
+import httpx
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+from ingest import API_URL
+
+# Intermediate files of the split/merge pipeline are uncompressed Arrow IPC
+# (Feather v2) files written in record batches: they can be memory-mapped,
+# a column can be read without parsing the others, and batches can be
+# processed one at a time
+CHUNK_ROWS = 50_000
+
+
+def write_frame(df, path, chunk_rows=CHUNK_ROWS):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    feather.write_feather(table, path, compression="uncompressed", chunksize=chunk_rows)
+
+def read_frame(path, columns=None):
+    """Read a file (or just some of its columns) through a memory map."""
+    return feather.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+def iter_batches(path, columns=None):
+    with pa.memory_map(path) as source:
+        reader = ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield batch.select(columns) if columns else batch
+
+def write_batches(path, batches):
+    writer = None
+    for batch in batches:
+        if writer is None:
+            writer = ipc.new_file(path, batch.schema)
+        writer.write_batch(batch)
+    if writer is not None:
+        writer.close()
+
+
+def export_to_feather(entity, path, limit=None, chunk_rows=CHUNK_ROWS, api_url=API_URL):
+    """
+    Stream /export/{entity}.ndjson into a Feather file one batch at a time,
+    so memory is bounded by ``chunk_rows`` whatever the collection size.
+    """
+    params = {"limit": limit} if limit is not None else {}
+
+    def batches():
+        schema = None
+        rows = []
+        with httpx.stream("GET", f"{api_url}/export/{entity}.ndjson", params=params, timeout=None) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    rows.append(json.loads(line))
+                if len(rows) >= chunk_rows:
+                    batch = pa.RecordBatch.from_pylist(rows, schema=schema)
+                    schema = batch.schema
+                    rows = []
+                    yield batch
+        if rows:
+            yield pa.RecordBatch.from_pylist(rows, schema=schema)
+
+    write_batches(path, batches())
+
+def split_columns(path, columns, extracted_path, remaining_path):
+    """Move ``columns`` into one file and the rest into another, batch by batch."""
+    writers = {}
+    for batch in iter_batches(path):
+        others = [name for name in batch.schema.names if name not in columns]
+        for out_path, part in ((extracted_path, batch.select(columns)), (remaining_path, batch.select(others))):
+            if out_path not in writers:
+                writers[out_path] = ipc.new_file(out_path, part.schema)
+            writers[out_path].write_batch(part)
+    for writer in writers.values():
+        writer.close()
+
+def concat_columns(left_path, right_path, out_path):
+    """Put the columns of two row-aligned files side by side, batch by batch."""
+    def batches():
+        for left, right in zip(iter_batches(left_path), iter_batches(right_path), strict=True):
+            if left.num_rows != right.num_rows:
+                raise ValueError("Files are not row-aligned")
+            yield pa.RecordBatch.from_arrays(
+                left.columns + right.columns,
+                names=left.schema.names + right.schema.names,
+            )
+
+    write_batches(out_path, batches())
@@ -0,0 +1,136 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Negotiated response compression. Small responses are sent as they are;
+# streamed responses (e.g. /export/) are compressed chunk by chunk.
+MIN_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 4  # Favours speed; higher levels cost far more CPU for a few % less
+SKIPPED_TYPES = (b"image/", b"video/", b"audio/", b"application/zip", b"application/gzip")
+
+
+def choose_encoding(accept_encoding):
+    """The best encoding the client accepts (q > 0), or None."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.compress = self._compressor.process
+            self.flush = self._compressor.flush
+            self.finish = self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31: gzip container
+            self.compress = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses with brotli or gzip, as the
+    client's Accept-Encoding allows.
+
+    A compressed response's ETag gets the encoding appended (``"abc-gzip"``)
+    so each representation has its own strong validator; the suffix is
+    stripped again from If-None-Match before the app sees it.
+    """
+
+    def __init__(self, app, min_size=MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        revalidated = None  # Encoding suffix of the tags in If-None-Match, echoed on a 304
+        if b"if-none-match" in headers:
+            for suffix in (b"-gzip", b"-br"):
+                if suffix + b"\"" in headers[b"if-none-match"]:
+                    revalidated = suffix
+            # In place: the router sets scope["route"], which outer middleware reads
+            scope["headers"] = [
+                (name, value.replace(b"-gzip\"", b"\"").replace(b"-br\"", b"\"") if name == b"if-none-match" else value)
+                for name, value in scope["headers"]
+            ]
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start = None
+        compressor = None
+
+        def compressed_start(message, length=None):
+            response_headers = [(name, value) for name, value in message.get("headers", [])
+                                if name not in (b"content-length", b"etag")]
+            for name, value in message.get("headers", []):
+                if name == b"etag" and value.endswith(b"\""):
+                    response_headers.append((b"etag", value[:-1] + f"-{encoding}\"".encode()))
+            response_headers.append((b"content-encoding", encoding.encode()))
+            response_headers.append((b"vary", b"Accept-Encoding"))
+            if length is not None:
+                response_headers.append((b"content-length", str(length).encode()))
+            return dict(message, headers=response_headers)
+
+        async def compressing_send(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            if start is not None:
+                response_headers = dict(start.get("headers", []))
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                skip = (b"content-encoding" in response_headers
+                        or response_headers.get(b"content-type", b"").startswith(SKIPPED_TYPES)
+                        or start["status"] in (204, 206, 304)
+                        or (not more_body and len(body) < self.min_size))
+                if skip:
+                    if start["status"] == 304 and revalidated is not None:
+                        start = dict(start, headers=[
+                            (name, value[:-1] + revalidated + b"\"" if name == b"etag" and value.endswith(b"\"") else value)
+                            for name, value in start.get("headers", [])
+                        ])
+                    await send(start)
+                    start = None
+                    return await send(message)
+                compressor = _Compressor(encoding)
+                if not more_body:
+                    body = compressor.compress(body) + compressor.finish()
+                    await send(compressed_start(start, len(body)))
+                    start = None
+                    return await send({"type": "http.response.body", "body": body})
+                await send(compressed_start(start))
+                start = None
+            elif compressor is None:
+                return await send(message)
+
+            more_body = message.get("more_body", False)
+            body = compressor.compress(message.get("body", b""))
+            body += compressor.flush() if more_body else compressor.finish()
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
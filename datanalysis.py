@@ -1,15 +1,109 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
-import pandas as pd
-import io
-import seaborn as sns
-import matplotlib.pyplot as plt
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, File, UploadFile, Header, Response
+from fastapi.concurrency import run_in_threadpool
+import shutil
+from pydantic import BaseModel
+from typing import Optional
+import mimetypes
 import os
+import threading
+from plotcache import PlotCache
+from httpcache import etag_matches
+from edajobs import EDAJobQueue
+
+# pandas, numpy and the plotting libraries are imported on the first request
+# that needs them, so a worker starts serving without paying for them. Set
+# WARMUP=1 to import them up front instead, e.g. in a pre-forking master.
+WARMUP = os.getenv("WARMUP", "0") == "1"
 
 app = FastAPI()
 
-# Configure the static directory for saving plots
-os.makedirs("static", exist_ok=True)
+# Static directory for uploads and plots, created when first written to
+
+# Rendered plots are cached under a hash of the data file and these parameters
+PLOT_PARAMS = {
+    "figsize": [10, 5],
+    "palette": "Set2",
+    "revenue_bins": 20,
+    "revenue_color": "green",
+}
+plot_cache = PlotCache("static/plots")
+DEFAULT_DATA = "static/ml.csv"  # Analysed by /eda-summary/
+
+
+# Rendering runs on a process pool (see edaplots.py and edajobs.py)
+eda_jobs = EDAJobQueue(plot_cache)
+
+@app.on_event("shutdown")
+def shutdown_eda_jobs():
+    eda_jobs.shutdown()
+
+# Uploads are copied to disk and profiled in chunks, so memory does not grow with file size
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+PROFILE_CHUNK_ROWS = 100_000
+
+def merge_dtypes(a, b):
+    """The dtype pandas would infer for a column made of chunks with dtypes a and b."""
+    import numpy as np
+    if a is None or a == b:
+        return b
+    if a.kind in "iuf" and b.kind in "iuf":
+        return np.promote_types(a, b)
+    return np.dtype(object)
+
+def profile_csv(file_path, chunk_rows=PROFILE_CHUNK_ROWS):
+    import pandas as pd
+    rows = 0
+    columns = None
+    nulls = {}
+    dtypes = {}
+    for chunk in pd.read_csv(file_path, chunksize=chunk_rows):
+        if columns is None:
+            columns = chunk.columns.tolist()
+            nulls = dict.fromkeys(columns, 0)
+            dtypes = dict.fromkeys(columns)
+        rows += len(chunk)
+        for column, count in chunk.isnull().sum().items():
+            nulls[column] += int(count)
+        for column, dtype in chunk.dtypes.items():
+            dtypes[column] = merge_dtypes(dtypes[column], dtype)
+    columns = columns or []
+    return {
+        "Shape": [rows, len(columns)],
+        "Columns": columns,
+        "Null Values": nulls,
+        "Data Types": {column: str(dtype) for column, dtype in dtypes.items()},
+    }
+
+def save_upload(source, file_path):
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = file_path + ".part"
+    with open(tmp_path, "wb") as out:
+        shutil.copyfileobj(source, out, UPLOAD_CHUNK_BYTES)
+    os.replace(tmp_path, file_path)
+
+# Per-column summaries, refreshed from where the last read stopped (see datasetstats.py)
+_dataset_stats = None
+_dataset_stats_lock = threading.Lock()
+
+def get_dataset_stats():
+    global _dataset_stats
+    with _dataset_stats_lock:
+        if _dataset_stats is None:
+            from datasetstats import DatasetStatsRegistry
+            _dataset_stats = DatasetStatsRegistry()
+        return _dataset_stats
+
+def warmup():
+    import pandas
+    import numpy
+    import datasetstats
+    import edaplots
+
+if WARMUP:
+    warmup()
+
+class EDAJobCreate(BaseModel):
+    file: str = "ml.csv"  # A CSV in the static directory
 
 @app.post("/upload-csv/")
 async def upload_csv(file: UploadFile = File(...)):
@@ -17,21 +111,12 @@ async def upload_csv(file: UploadFile = File(...)):
     Upload and analyze CSV for Hostel Management data.
     """
     try:
-        # Read CSV content into a DataFrame
-        content = await file.read()
-        df = pd.read_csv(io.BytesIO(content))
-
-        # Basic Data Overview
-        data_overview = {
-            "Shape": df.shape,
-            "Columns": df.columns.tolist(),
-            "Null Values": df.isnull().sum().to_dict(),
-            "Data Types": df.dtypes.to_dict()
-        }
-
-        # Save CSV for further analysis
-        file_path = f"static/{file.filename}"
-        df.to_csv(file_path, index=False)
+        # Save CSV for further analysis, copying it to disk in chunks
+        file_path = os.path.join("static", os.path.basename(file.filename))
+        await run_in_threadpool(save_upload, file.file, file_path)
+
+        # Basic Data Overview, merged across chunks off the event loop
+        data_overview = await run_in_threadpool(profile_csv, file_path)
 
         return {"message": "File uploaded successfully", "overview": data_overview}
 
@@ -46,47 +131,80 @@ def eda_summary():
     """
     try:
         # Load the previously uploaded file
-        file_path = "static/ml.csv"
+        file_path = DEFAULT_DATA
         if not os.path.exists(file_path):
             raise HTTPException(status_code=404, detail="No data file found for analysis")
 
-        df = pd.read_csv(file_path)
-
-        # Example Visualizations
-        plots = []
-
-        # Visualization 1: Room Booking Trends
-        plt.figure(figsize=(10, 5))
-        sns.countplot(data=df, x='room_type', palette='Set2')
-        plt.title("Room Booking Distribution")
-        plot_path = "static/room_booking_distribution.png"
-        plt.savefig(plot_path)
-        plt.close()
-        plots.append(plot_path)
-
-        # Visualization 2: Booking Revenue
-        if 'revenue' in df.columns:
-            plt.figure(figsize=(10, 5))
-            sns.histplot(df['revenue'], kde=True, bins=20, color='green')
-            plt.title("Revenue Distribution")
-            plot_path = "static/revenue_distribution.png"
-            plt.savefig(plot_path)
-            plt.close()
-            plots.append(plot_path)
+        # Plots are only rendered when the data or parameters changed
+        plots = eda_jobs.run(file_path, PLOT_PARAMS)
 
         return {"message": "EDA performed successfully", "plots": plots}
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error during EDA: {str(e)}")
 
 
+@app.post("/eda-jobs/", status_code=202)
+def create_eda_job(job: EDAJobCreate):
+    """
+    Schedule EDA rendering for an uploaded CSV; poll GET /eda-jobs/{id} for the result.
+    """
+    file_path = os.path.join("static", os.path.basename(job.file))
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="No data file found for analysis")
+    created, _ = eda_jobs.submit(file_path, PLOT_PARAMS)
+    return eda_jobs.get(created["id"])
+
+
+@app.get("/eda-jobs/{job_id}")
+def read_eda_job(job_id: str):
+    """
+    Status of an EDA job, with its plots once done.
+    """
+    job = eda_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.get("/datasets/{name}/stats")
+def dataset_statistics(name: str):
+    """
+    Column statistics of an uploaded CSV; only rows appended since the last call are read.
+    """
+    file_name = os.path.basename(name)
+    if not file_name.endswith(".csv"):
+        file_name += ".csv"
+    file_path = os.path.join("static", file_name)
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    try:
+        stats = get_dataset_stats().get(file_path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing statistics: {str(e)}")
+    return {"name": file_name, **stats}
+
+
 @app.get("/download-plot/{plot_name}")
-def download_plot(plot_name: str):
+def download_plot(plot_name: str, if_none_match: Optional[str] = Header(None)):
     """
-    Download generated plots by name.
+    Download generated plots by name. A plain name such as
+    ``room_booking_distribution.png`` is the latest render of ml.csv.
     """
-    plot_path = f"static/{plot_name}"
-    if os.path.exists(plot_path):
-        return FileResponse(plot_path)
-    else:
+    plot_name = os.path.basename(plot_name)
+    plot_path = os.path.join(plot_cache.directory, plot_name)
+    if not os.path.isfile(plot_path):
+        plot_path = plot_cache.current(DEFAULT_DATA, PLOT_PARAMS, plot_name) or os.path.join("static", plot_name)
+    if not os.path.isfile(plot_path):
         raise HTTPException(status_code=404, detail="Plot not found")
+
+    content, etag = plot_cache.read(plot_path)
+    # Aliases change with the data, so they are revalidated rather than cached for an hour
+    max_age = 3600 if os.path.basename(plot_path) == plot_name else 0
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    media_type = mimetypes.guess_type(plot_path)[0] or "application/octet-stream"
+    return Response(content=content, media_type=media_type, headers=headers)
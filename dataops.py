@@ -1,47 +1,16 @@
-import requests
+import httpx
 import pandas as pd
+from ingest import load_frames
 
 try:
-    # Fetching data from the Hostels API
-    hostels_api = requests.get('http://localhost:8000/hostels')
-    hostels_api.raise_for_status()
-    hostels_api_data = hostels_api.json()  # Expecting a list of hostels
+    # Fetching hostels, rooms and the joined views from the API concurrently, as Arrow.
+    # The API keeps the joins materialized (see views.py), so nothing is merged here
+    frames = load_frames("hostels", "rooms", "views/rooms-with-hostel", "views/bookings-enriched", fmt="arrow")
+    hostels_df = frames["hostels"]
+    rooms_df = frames["rooms"]
 
-    # Fetching data from the Rooms API
-    rooms_api = requests.get("http://localhost:8000/rooms")
-    rooms_api.raise_for_status()
-    rooms_api_data = rooms_api.json()  # Expecting a list of rooms
-
-    # Check if hostels_api_data is a list (not a dictionary with a 'hostels' key)
-    if isinstance(hostels_api_data, list):
-        hostels_df = pd.DataFrame(hostels_api_data)  # Directly convert list to DataFrame
-    else:
-        print("Error: Unexpected data format for hostels API.")
-        exit()
-
-    # Creating DataFrame for rooms, assuming rooms_api_data is structured as a list of rooms
-    if isinstance(rooms_api_data, list):
-        rooms_df = pd.DataFrame(rooms_api_data)
-    else:
-        print("Error: Unexpected data format for rooms API.")
-        exit()
-
-
-    # Fetching data from the Bookings API
-    bookings_api = requests.get("http://localhost:8000/bookings")
-    bookings_api.raise_for_status()
-    bookings_api_data = bookings_api.json()  # Expecting a list of bookings
-
-    # Check if bookings_api_data is a list
-    if isinstance(bookings_api_data, list):
-        bookings_df = pd.DataFrame(bookings_api_data)
-    else:
-        print("Error: Unexpected data format for bookings API.")
-        exit()
-
-
-    # Merging Hostels and Rooms data (inner join on hostel_id)
-    merged_df = pd.merge(hostels_df, rooms_df, left_on="id", right_on="hostel_id", how="inner")
+    # Hostels and Rooms data (inner join on hostel_id)
+    merged_df = frames["views/rooms-with-hostel"]
 
     # Counting rows in each DataFrame
     print(f"Hostels DataFrame row count: {hostels_df.shape[0]}")
@@ -58,28 +27,21 @@ try:
     print("\nMerged DataFrame Description:")
     print(merged_df.describe())
 
-    # Encoding categorical features for hostels_df
-    hostels_df = pd.get_dummies(hostels_df, drop_first=True)
-
-    # Encoding categorical features for rooms_df
-    rooms_df = pd.get_dummies(rooms_df, drop_first=True)
-
-    # Right Join: All rows from rooms_df and matched rows from bookings_df based on room_id
-    right_joined_df = pd.merge(rooms_df, bookings_df, left_on="id", right_on="room_id", how="right")
-
-    # Calculate Length of Stay in bookings data
-    right_joined_df['check_in_date'] = pd.to_datetime(right_joined_df['check_in_date'])  # Ensure check_in is in datetime format
-    right_joined_df['check_out_date'] = pd.to_datetime(right_joined_df['check_out_date'])  # Ensure check_out is in datetime format
-    right_joined_df['length_of_stay'] = (right_joined_df['check_out_date'] - right_joined_df['check_in_date']).dt.days
+    # Right Join: All bookings with their room and hostel, and the Length of Stay
+    right_joined_df = frames["views/bookings-enriched"]
 
     print("\nRight Joined Bookings to Engineer Length of Stay:")
     print(right_joined_df)
 
     # Further analysis and additional join operations if necessary
-    # Example of a full outer join with hostels and rooms data (all rows from both)
-    outer_joined_df = pd.merge(hostels_df, rooms_df, left_on="id", right_on="hostel_id", how="outer")
+    # Example of a full outer join with hostels and rooms data (all rows from both):
+    # the inner join plus the rooms whose hostel is missing and the hostels without rooms
+    orphan_rooms_df = rooms_df[~rooms_df["id"].isin(merged_df["id"])]
+    empty_hostels_df = hostels_df[~hostels_df["id"].isin(merged_df["hostel_id"])].rename(
+        columns={"id": "hostel_id", "name": "hostel_name", "location": "hostel_location"})
+    outer_joined_df = pd.concat([merged_df, orphan_rooms_df, empty_hostels_df], ignore_index=True)
     print("\nFull Outer Join between Hostels and Rooms:")
     print(outer_joined_df)
 
-except requests.exceptions.RequestException as e:
+except httpx.HTTPError as e:
     print(f"Error fetching data from API: {e}")
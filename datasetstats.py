@@ -0,0 +1,267 @@
+import hashlib
+import io
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+# Mergeable per-column summaries of a CSV, refreshed from the last byte read
+# so appending rows only costs the new rows. Rows are split on newlines (so
+# quoted fields must not contain line breaks) and counted once their line ends.
+READ_BLOCK_BYTES = 8 * 1024 * 1024
+FINGERPRINT_BYTES = 64 * 1024  # Prefix hashed to notice a file being replaced
+QUANTILES = (0.25, 0.5, 0.75)
+TOP_K = 10
+
+
+class QuantileSketch:
+    """
+    KLL-style sketch: level ``i`` holds sorted samples of weight ``2**i``.
+    A level over ``k`` items keeps every other item in the next level, so
+    memory is O(k log n) and two sketches merge level by level.
+    """
+
+    def __init__(self, k=256):
+        self.k = k
+        self.levels = []
+        self._offset = 0  # Alternates which half survives a compaction
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                items = np.sort(items)
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[self._offset::2]])
+                self.levels[level] = np.empty(0)
+                self._offset ^= 1
+            level += 1
+
+    def update(self, values):
+        if not self.levels:
+            self.levels.append(np.empty(0))
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=float)])
+        self._compress()
+
+    def merge(self, other):
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+
+    def quantiles(self, qs):
+        values = np.concatenate(self.levels) if self.levels else np.empty(0)
+        if not len(values):
+            return [None for _ in qs]
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values)
+        values, cumulative = values[order], np.cumsum(weights[order])
+        ranks = np.asarray(qs) * cumulative[-1]
+        return [float(values[min(i, len(values) - 1)]) for i in np.searchsorted(cumulative, ranks)]
+
+
+class NumericSummary:
+    """Count, mean and variance (Welford/Chan updates), min/max and quantiles."""
+
+    kind = "numeric"
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch()
+
+    def _combine(self, count, mean, m2, low, high):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def update(self, series):
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+        present = values[~np.isnan(values)]
+        self.nulls += len(values) - len(present)
+        if len(present):
+            mean = present.mean()
+            self._combine(len(present), mean, float(((present - mean) ** 2).sum()), float(present.min()), float(present.max()))
+            self.sketch.update(present)
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.sketch.merge(other.sketch)
+
+    def to_dict(self):
+        variance = self.m2 / (self.count - 1) if self.count > 1 else None
+        quantiles = self.sketch.quantiles(QUANTILES)
+        return {
+            "type": self.kind,
+            "count": self.count,
+            "nulls": self.nulls,
+            "mean": self.mean if self.count else None,
+            "std": variance ** 0.5 if variance is not None else None,
+            "variance": variance,
+            "min": self.min,
+            "max": self.max,
+            "quantiles": {f"{q:.0%}": value for q, value in zip(QUANTILES, quantiles)},
+        }
+
+
+class CategoricalSummary:
+    """
+    Count and top values, tracked with Misra-Gries counters: exact while a
+    column has at most ``capacity`` distinct values, lower bounds beyond.
+    """
+
+    kind = "categorical"
+
+    def __init__(self, capacity=100):
+        self.capacity = capacity
+        self.count = 0
+        self.nulls = 0
+        self.counters = {}
+
+    def _add(self, counts):
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        if len(self.counters) > self.capacity:
+            cutoff = sorted(self.counters.values(), reverse=True)[self.capacity]
+            self.counters = {value: count - cutoff for value, count in self.counters.items() if count > cutoff}
+
+    def update(self, series):
+        present = series.dropna()
+        self.nulls += len(series) - len(present)
+        self.count += len(present)
+        self._add(present.astype(str).value_counts().to_dict())
+
+    def merge(self, other):
+        self.nulls += other.nulls
+        self.count += other.count
+        self._add(other.counters)
+
+    def to_dict(self):
+        top = sorted(self.counters.items(), key=lambda item: (-item[1], item[0]))[:TOP_K]
+        return {
+            "type": self.kind,
+            "count": self.count,
+            "nulls": self.nulls,
+            "top": [{"value": value, "count": count} for value, count in top],
+        }
+
+
+class _Reclassified(Exception):
+    pass
+
+
+class DatasetStats:
+    """
+    Summaries of one CSV file. ``refresh`` reads from the byte offset where
+    the previous call stopped, and starts over if the file was replaced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._categorical = set()  # Columns that turned out not to be numeric after all
+        self._reset()
+
+    def _reset(self):
+        self.columns = None
+        self.summaries = {}
+        self.rows = 0
+        self.offset = 0  # End of the last complete line read
+        self.fingerprint = None
+        self.stat = None
+        self._result = None
+
+    def _fingerprint(self, f):
+        f.seek(0)
+        return hashlib.sha256(f.read(min(self.offset, FINGERPRINT_BYTES))).hexdigest()
+
+    def _add_rows(self, block):
+        chunk = pd.read_csv(io.BytesIO(block), header=None, names=self.columns)
+        for column, dtype in chunk.dtypes.items():
+            summary = self.summaries.get(column)
+            if summary is None or (summary.kind == "numeric" and summary.count == 0):
+                # Decided by the first block with values; empty columns read as float
+                numeric = dtype.kind in "iuf" and column not in self._categorical
+                self.summaries[column] = NumericSummary() if numeric else CategoricalSummary()
+                self.summaries[column].nulls = summary.nulls if summary is not None else 0
+            elif summary.kind == "numeric" and dtype.kind not in "iufb":
+                values = chunk[column]
+                if pd.to_numeric(values, errors="coerce").isna().sum() > values.isna().sum():
+                    # Text in a column read as numeric so far: start over, counting it as categorical
+                    self._categorical.add(column)
+                    raise _Reclassified(column)
+        for column, summary in self.summaries.items():
+            summary.update(chunk[column])
+        self.rows += len(chunk)
+
+    def refresh(self):
+        st = os.stat(self.path)
+        stat = (st.st_size, st.st_mtime_ns)
+        if stat == self.stat:
+            return False
+        while True:
+            try:
+                self._read(st)
+                break
+            except _Reclassified:
+                self._reset()
+        self.stat = stat
+        self._result = None
+        return True
+
+    def _read(self, st):
+        with open(self.path, "rb") as f:
+            if self.fingerprint is not None and (st.st_size < self.offset or self._fingerprint(f) != self.fingerprint):
+                self._reset()
+                self._categorical.clear()
+            if self.columns is None:
+                f.seek(0)
+                header = f.readline()
+                self.columns = pd.read_csv(io.BytesIO(header)).columns.tolist()
+                self.offset = len(header)
+            f.seek(self.offset)
+            pending = b""
+            for block in iter(lambda: f.read(READ_BLOCK_BYTES), b""):
+                block = pending + block
+                end = block.rfind(b"\n") + 1
+                if end:
+                    self._add_rows(block[:end])
+                    self.offset += end
+                pending = block[end:]
+            self.fingerprint = self._fingerprint(f)
+
+    def to_dict(self):
+        if self._result is None:
+            self._result = {
+                "rows": self.rows,
+                "columns": {column: summary.to_dict() for column, summary in self.summaries.items()},
+            }
+        return self._result
+
+
+class DatasetStatsRegistry:
+    """One DatasetStats per file, refreshed on access."""
+
+    def __init__(self):
+        self._datasets = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        with self._lock:
+            stats = self._datasets.get(path)
+            if stats is None:
+                stats = self._datasets[path] = DatasetStats(path)
+            stats.refresh()
+            return stats.to_dict()
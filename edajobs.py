@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+EDA_WORKERS = int(os.getenv("EDA_WORKERS", str(os.cpu_count() or 1)))
+MAX_JOBS = 1000  # Finished jobs kept for GET /eda-jobs/{id}
+
+
+def _render(data_path, params, path_template):
+    # Runs in the worker processes; seaborn and matplotlib are only imported there
+    from edaplots import render_plots
+    return render_plots(data_path, params, path_template)
+
+
+class EDAJobQueue:
+    """
+    Renders EDA plots on a process pool and tracks each request as a job.
+
+    Cached plots finish a job immediately. Jobs for the same input and
+    parameters that are already rendering share one render.
+    """
+
+    def __init__(self, plot_cache, max_workers=EDA_WORKERS):
+        self.plot_cache = plot_cache
+        self.max_workers = max_workers
+        self._pool = None
+        self._jobs = OrderedDict()
+        self._rendering = {}  # digest -> Future
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def submit(self, data_path, params):
+        job = {"id": uuid.uuid4().hex, "status": "queued", "file": data_path,
+               "created_at": time.time(), "plots": None, "error": None}
+        digest, plots = self.plot_cache.lookup(data_path, params)
+        with self._lock:
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > MAX_JOBS:
+                self._jobs.popitem(last=False)
+            if plots is not None:
+                job.update(status="done", plots=plots)
+                return job, None
+            finished = threading.Event()
+
+            future = self._rendering.get(digest)
+            if future is None:
+                future = self._get_pool().submit(_render, data_path, params, self.plot_cache.path_template(digest))
+                self._rendering[digest] = future
+            job["status"] = "running"
+        future.add_done_callback(lambda f: self._finish(job, digest, f, finished))
+        return job, finished
+
+    def _finish(self, job, digest, future, finished):
+        with self._lock:
+            self._rendering.pop(digest, None)
+            try:
+                job.update(status="done", plots=self.plot_cache.record(digest, future.result()))
+            except Exception as e:
+                job.update(status="failed", error=str(e))
+        finished.set()
+
+    def run(self, data_path, params):
+        """Submit a job and wait for it; returns the plot paths or raises."""
+        job, finished = self.submit(data_path, params)
+        if finished is not None:
+            finished.wait()
+        if job["status"] == "failed":
+            raise RuntimeError(job["error"])
+        return job["plots"]
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown()
@@ -0,0 +1,35 @@
+import pandas as pd
+import seaborn as sns
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+# Plot rendering for datanalysis.py. This runs in worker processes, so it uses
+# the object-oriented Figure API on the Agg canvas rather than pyplot's
+# global state.
+
+def new_axes(figsize):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig, fig.subplots()
+
+def render_plots(file_path, params, path_template):
+    """Render the EDA plots of a CSV to ``path_template.format(plot=name)``; return the names."""
+    df = pd.read_csv(file_path)
+    plots = []
+
+    # Visualization 1: Room Booking Trends
+    fig, ax = new_axes(params["figsize"])
+    sns.countplot(data=df, x='room_type', hue='room_type', palette=params["palette"], legend=False, ax=ax)
+    ax.set_title("Room Booking Distribution")
+    fig.savefig(path_template.format(plot="room_booking_distribution"))
+    plots.append("room_booking_distribution")
+
+    # Visualization 2: Booking Revenue
+    if 'revenue' in df.columns:
+        fig, ax = new_axes(params["figsize"])
+        sns.histplot(df['revenue'], kde=True, bins=params["revenue_bins"], color=params["revenue_color"], ax=ax)
+        ax.set_title("Revenue Distribution")
+        fig.savefig(path_template.format(plot="revenue_distribution"))
+        plots.append("revenue_distribution")
+
+    return plots
@@ -1,33 +1,23 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, String, Integer, ForeignKey, Float
-from sqlalchemy.orm import relationship
-from uuid import uuid4
+from sqlalchemy import create_engine, delete, func, insert, select
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
+import argparse
+import os
 import random
+import time
+import numpy as np
+from database import DATABASE_URL, Base
+from models import Hostel, Room, IdSequence
 
-# SQLite database configuration
-DATABASE_URL = "sqlite:///hostel_management.db"
-engine = create_engine(DATABASE_URL, echo=True)
-Base = declarative_base()
-
-# Define models for Hostel Management System
-class Hostel(Base):
-    __tablename__ = "hostels"
-    hostel_id = Column(String, primary_key=True, index=True)
-    name = Column(String, index=True)
-    location = Column(String, nullable=False)
-    rooms = relationship("Room", back_populates="hostel")
-
-class Room(Base):
-    __tablename__ = "rooms"
-    room_id = Column(String, primary_key=True, index=True)
-    room_type = Column(String, nullable=False)
-    price = Column(Float)
-    availability = Column(Integer, default=1)
-    hostel_id = Column(String, ForeignKey("hostels.hostel_id"))
-    hostel = relationship("Hostel", back_populates="rooms")
+# SQLite database configuration (DATABASE_URL in database.py)
+engine = create_engine(DATABASE_URL)
+
+# Capacity implied by each generated room type
+ROOM_TYPES = np.array(["Single", "Double", "Suite"])
+ROOM_CAPACITY = {"Single": 1, "Double": 2, "Suite": 4}
+CAPACITIES = np.array([ROOM_CAPACITY[t] for t in ROOM_TYPES])
+FAKER_POOL_SIZE = 1_000
 
 # Faker instance for generating random data
 fake = Faker()
@@ -42,9 +32,9 @@ def seed_data(session: Session, num_hostels=10_000, total_rooms=500_000, batch_s
     total_hostels_added = 0
     for i in range(num_hostels):
         hostel = Hostel(
-            hostel_id=str(uuid4()),
             name=fake.company(),
-            location=fake.city()
+            location=fake.city(),
+            owner_id=1
         )
         hostels.append(hostel)
         if len(hostels) >= batch_size:
@@ -66,14 +56,16 @@ def seed_data(session: Session, num_hostels=10_000, total_rooms=500_000, batch_s
         num_rooms = rooms_per_hostel + (1 if leftover_rooms > 0 else 0)
         if leftover_rooms > 0:
             leftover_rooms -= 1
-        for _ in range(num_rooms):
+        for number in range(1, num_rooms + 1):
             room_count += 1
+            room_type = fake.random_element(elements=["Single", "Double", "Suite"])
             room = Room(
-                room_id=str(uuid4()),
-                room_type=fake.random_element(elements=["Single", "Double", "Suite"]),
-                price=random.uniform(30.0, 150.0),
-                availability=random.randint(0, 1),
-                hostel_id=hostel.hostel_id
+                hostel_id=hostel.id,
+                number=str(number),
+                capacity=ROOM_CAPACITY[room_type],
+                available=bool(random.randint(0, 1)),
+                room_type=room_type,
+                price=random.uniform(30.0, 150.0)
             )
             rooms.append(room)
             if len(rooms) >= batch_size:
@@ -86,13 +78,122 @@ def seed_data(session: Session, num_hostels=10_000, total_rooms=500_000, batch_s
         session.commit()
         print(f"{room_count} rooms added.")
 
+# Fast seeding: rows are generated in vectorized chunks on a process pool and
+# inserted with Core executemany inside a single transaction
+
+def faker_pool(seed, size=FAKER_POOL_SIZE):
+    """Precomputed Faker values to sample from, instead of one Faker call per row."""
+    pool_faker = Faker()
+    pool_faker.seed_instance(seed)
+    companies = np.array([pool_faker.company() for _ in range(size)])
+    cities = np.array([pool_faker.city() for _ in range(size)])
+    return companies, cities
+
+def generate_hostels(first_id, count, seed):
+    rng = np.random.default_rng(seed)
+    companies, cities = faker_pool(seed)
+    names = companies[rng.integers(0, len(companies), count)]
+    locations = cities[rng.integers(0, len(cities), count)]
+    return [
+        {"id": first_id + i, "name": name, "location": location, "owner_id": 1}
+        for i, (name, location) in enumerate(zip(names.tolist(), locations.tolist()))
+    ]
+
+def generate_rooms(first_id, hostel_ids, rooms_per_hostel, seed):
+    """Rooms for a run of hostels; hostel ``hostel_ids[i]`` gets ``rooms_per_hostel[i]`` rooms."""
+    rng = np.random.default_rng(seed)
+    counts = np.asarray(rooms_per_hostel)
+    total = int(counts.sum())
+    hostel_column = np.repeat(np.asarray(hostel_ids), counts)
+    # Room numbers restart at 1 for every hostel
+    numbers = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    types = rng.integers(0, len(ROOM_TYPES), total)
+    prices = rng.uniform(30.0, 150.0, total).round(2)
+    available = rng.integers(0, 2, total).astype(bool)
+    return [
+        {"id": first_id + i, "hostel_id": h, "number": str(n), "capacity": c,
+         "available": a, "room_type": t, "price": p}
+        for i, (h, n, c, a, t, p) in enumerate(zip(
+            hostel_column.tolist(), numbers.tolist(), CAPACITIES[types].tolist(),
+            available.tolist(), ROOM_TYPES[types].tolist(), prices.tolist()))
+    ]
+
+def fast_seed(num_hostels, total_rooms, workers=None, seed=0, chunk_hostels=500):
+    """Seed hostels and rooms after the existing ids; returns the number of rows inserted."""
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            # Bulk-load settings; they only last for this connection
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.exec_driver_sql("PRAGMA journal_mode = MEMORY")
+            conn.exec_driver_sql("PRAGMA cache_size = -200000")
+        first_hostel = conn.scalar(select(func.coalesce(func.max(Hostel.id), 0))) + 1
+        first_room = conn.scalar(select(func.coalesce(func.max(Room.id), 0))) + 1
+
+        rooms_per_hostel = np.full(num_hostels, total_rooms // num_hostels)
+        rooms_per_hostel[:total_rooms % num_hostels] += 1
+        room_offsets = np.concatenate(([0], np.cumsum(rooms_per_hostel)))
+
+        rows = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Chunk i always gets seed + i, so a run is reproducible for any --workers
+            starts = range(0, num_hostels, chunk_hostels)
+            hostel_jobs = [
+                pool.submit(generate_hostels, first_hostel + start, min(chunk_hostels, num_hostels - start), seed + i)
+                for i, start in enumerate(starts)
+            ]
+            room_jobs = [
+                pool.submit(
+                    generate_rooms,
+                    first_room + int(room_offsets[start]),
+                    list(range(first_hostel + start, first_hostel + min(start + chunk_hostels, num_hostels))),
+                    rooms_per_hostel[start:start + chunk_hostels].tolist(),
+                    seed + len(hostel_jobs) + i,
+                )
+                for i, start in enumerate(starts)
+            ]
+            for model, jobs in ((Hostel, hostel_jobs), (Room, room_jobs)):
+                for job in jobs:
+                    chunk = job.result()
+                    if chunk:
+                        conn.execute(insert(model), chunk)
+                        rows += len(chunk)
+
+        advance_sequences(conn)
+    return rows
+
+def advance_sequences(conn):
+    """Keep the API's id allocator (see sqlstore.py) ahead of the seeded rows."""
+    for model in (Hostel, Room):
+        name = model.__tablename__
+        last_id = max(conn.scalar(select(func.coalesce(func.max(model.id), 0))),
+                      conn.scalar(select(IdSequence.value).where(IdSequence.name == name)) or 0)
+        conn.execute(delete(IdSequence).where(IdSequence.name == name))
+        conn.execute(insert(IdSequence), [{"name": name, "value": last_id}])
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed the database with generated hostels and rooms")
+    parser.add_argument("--rows", type=int, default=500_000, help="number of rooms to generate")
+    parser.add_argument("--hostels", type=int, default=10_000, help="number of hostels to generate")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="generator processes")
+    parser.add_argument("--seed", type=int, default=0, help="base random seed")
+    parser.add_argument("--orm", action="store_true", help="use the original one-object-at-a-time ORM seeding")
+    args = parser.parse_args()
+
     # Create tables
     Base.metadata.create_all(bind=engine)
 
-    # Initialize database session
-    db_session = Session(bind=engine)
-    try:
-        seed_data(db_session, num_hostels=10_000, total_rooms=50_000, batch_size=2_000)
-    finally:
-        db_session.close()
+    started = time.perf_counter()
+    if args.orm:
+        # Initialize database session
+        db_session = Session(bind=engine)
+        try:
+            seed_data(db_session, num_hostels=args.hostels, total_rooms=args.rows, batch_size=2_000)
+        finally:
+            db_session.close()
+        with engine.begin() as conn:
+            advance_sequences(conn)
+        inserted = args.hostels + args.rows
+    else:
+        inserted = fast_seed(args.hostels, args.rows, workers=args.workers, seed=args.seed)
+    elapsed = time.perf_counter() - started
+    print(f"{inserted} rows inserted in {elapsed:.1f}s ({inserted / elapsed:,.0f} rows/s)")
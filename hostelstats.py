@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta
+from availability import as_naive_utc
+
+MAX_SERIES_DAYS = 366
+
+
+def stay_days(booking):
+    """Dates a booking occupies its room: check-in day up to the day before check-out."""
+    check_in = as_naive_utc(booking["check_in_date"]).date()
+    check_out = as_naive_utc(booking["check_out_date"]).date()
+    return [check_in + timedelta(days=i) for i in range(max((check_out - check_in).days, 1))]
+
+
+class HostelTotals:
+    """
+    Room, booking and per-day occupancy counters of one hostel. Records are
+    added with ``sign=1`` and taken back out with ``sign=-1``, so the totals
+    can follow updates without rescanning anything.
+    """
+
+    def __init__(self):
+        self.rooms = 0
+        self.capacity = 0
+        self.listed_rooms = 0  # Rooms with the admin "available" flag set; not occupancy
+        self.bookings = 0
+        self.booked_nights = 0
+        self.revenue = 0.0  # Nights times room price, for rooms that have one
+        self.daily = {}  # date -> rooms booked that day
+        self.room_bookings = {}  # room_id -> bookings, for booked_rooms
+
+    def add_room(self, room, sign=1):
+        self.rooms += sign
+        self.capacity += sign * room["capacity"]
+        self.listed_rooms += sign * bool(room["available"])
+
+    def add_booking(self, booking, room, sign=1):
+        days = stay_days(booking)
+        self.bookings += sign
+        self.booked_nights += sign * len(days)
+        self.revenue += sign * len(days) * (room.get("price") or 0.0)
+        for day in days:
+            count = self.daily.get(day, 0) + sign
+            if count:
+                self.daily[day] = count
+            else:
+                del self.daily[day]
+        count = self.room_bookings.get(room["id"], 0) + sign
+        if count:
+            self.room_bookings[room["id"]] = count
+        else:
+            del self.room_bookings[room["id"]]
+
+    def summary(self, hostel_id, today=None):
+        today = today or datetime.utcnow().date()
+        booked_today = self.daily.get(today, 0)
+        return {
+            "hostel_id": hostel_id,
+            "rooms": self.rooms,
+            "capacity": self.capacity,
+            "listed_rooms": self.listed_rooms,
+            "bookings": self.bookings,
+            "booked_rooms": len(self.room_bookings),
+            "booked_nights": self.booked_nights,
+            "revenue": self.revenue,
+            "booked_today": booked_today,
+            "occupancy_today": booked_today / self.rooms if self.rooms else 0.0,
+        }
+
+    def series(self, start=None, end=None):
+        """
+        Rooms booked per day. With ``start`` and ``end`` (inclusive) every day
+        is listed; otherwise only the days with bookings.
+        """
+        if start is None or end is None:
+            days = sorted(self.daily)
+        else:
+            days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return [
+            {
+                "date": day.isoformat(),
+                "booked_rooms": self.daily.get(day, 0),
+                "occupancy": self.daily.get(day, 0) / self.rooms if self.rooms else 0.0,
+            }
+            for day in days
+        ]
+
+
+class HostelStats:
+    """
+    HostelTotals for every hostel of an in-memory Store, maintained on each
+    room and booking write. A room moving hostel or changing price moves its
+    bookings' contributions along with it.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._totals = {}
+
+    def _hostel(self, hostel_id):
+        totals = self._totals.get(hostel_id)
+        if totals is None:
+            totals = self._totals[hostel_id] = HostelTotals()
+        return totals
+
+    def _room_bookings(self, room, sign):
+        totals = self._hostel(room["hostel_id"])
+        for booking in self.store.page("bookings", room_id=room["id"]):
+            totals.add_booking(booking, room, sign)
+
+    def room_changed(self, previous, room):
+        moved = previous is None or (previous["hostel_id"], previous.get("price")) != (room["hostel_id"], room.get("price"))
+        if previous is not None:
+            self._hostel(previous["hostel_id"]).add_room(previous, -1)
+            if moved:
+                self._room_bookings(previous, -1)
+        self._hostel(room["hostel_id"]).add_room(room)
+        if moved:
+            self._room_bookings(room, 1)
+
+    def booking_changed(self, previous, booking):
+        if previous is not None:
+            room = self.store.get("rooms", previous["room_id"])
+            if room is not None:
+                self._hostel(room["hostel_id"]).add_booking(previous, room, -1)
+        room = self.store.get("rooms", booking["room_id"])
+        if room is not None:
+            self._hostel(room["hostel_id"]).add_booking(booking, room)
+
+    def room_removed(self, room):
+        self._hostel(room["hostel_id"]).add_room(room, -1)
+        self._room_bookings(room, -1)
+
+    def booking_removed(self, booking):
+        room = self.store.get("rooms", booking["room_id"])
+        if room is not None:
+            self._hostel(room["hostel_id"]).add_booking(booking, room, -1)
+
+    def get(self, hostel_id, start=None, end=None):
+        totals = self._totals.get(hostel_id) or HostelTotals()
+        return dict(totals.summary(hostel_id), series=totals.series(start, end))
+
+    def page(self, after_id=0, limit=None):
+        today = datetime.utcnow().date()
+        return [
+            (self._totals.get(hostel["id"]) or HostelTotals()).summary(hostel["id"], today)
+            for hostel in self.store.page("hostels", after_id=after_id, limit=limit)
+        ]
@@ -0,0 +1,47 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+# Checks that the apps import quickly and leave the analytics libraries for
+# later (see WARMUP in datanalysis.py): python importbudget.py
+# Exits with 1 when a budget is exceeded or a deferred module got imported.
+BUDGETS = {"main": 0.8, "datanalysis": 0.8}  # Seconds of cumulative import time
+DEFERRED = ("pandas", "numpy", "pyarrow", "matplotlib", "seaborn", "httpx")
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def import_times(module):
+    """``{module: cumulative seconds}`` from ``python -X importtime``."""
+    with tempfile.TemporaryDirectory() as workdir:
+        # Run away from the repo so the app starts on an empty database.json
+        env = dict(os.environ, PYTHONPATH=REPO_DIR, DB_FILE=os.path.join(workdir, "database.json"), WARMUP="0")
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=workdir, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def check(module, budget):
+    times = import_times(module)
+    failures = []
+    if times[module] > budget:
+        failures.append(f"{module} took {times[module]:.3f}s to import (budget {budget:.3f}s)")
+    for name in DEFERRED:
+        if name in times:
+            failures.append(f"{module} imported {name} ({times[name]:.3f}s)")
+    slowest = sorted(((t, name) for name, t in times.items() if "." not in name and name != module), reverse=True)[:5]
+    print(f"{module}: {times[module]:.3f}s; slowest: " + ", ".join(f"{name} {t:.3f}s" for t, name in slowest))
+    return failures
+
+
+if __name__ == "__main__":
+    failures = [failure for module, budget in BUDGETS.items() for failure in check(module, budget)]
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,88 @@
+import asyncio
+import os
+import httpx
+import pandas as pd
+
+# Shared client for the analysis scripts (dataops.py, splitdata.py, splitwith2.py)
+API_URL = os.getenv("API_URL", "http://localhost:8000")  # Change to your FastAPI server URL
+PAGE_SIZE = 1000
+MAX_CONNECTIONS = 8
+RETRIES = 3
+# Wire formats for the list endpoints (see negotiate_format in serialization.py).
+# "arrow" decodes straight into columns; "msgpack" is smaller and faster to parse than JSON.
+ACCEPT = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+async def get_with_retries(client, path, params, retries=RETRIES):
+    """GET with exponential backoff on connection errors and 5xx responses."""
+    for attempt in range(retries + 1):
+        try:
+            response = await client.get(path, params=params)
+        except httpx.TransportError:
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code < 500 or attempt == retries:
+                response.raise_for_status()
+                return response
+        await asyncio.sleep(0.2 * 2 ** attempt)
+
+
+def decode_page(response):
+    """A page as a list of records, or a pyarrow Table for Arrow responses."""
+    content_type = response.headers.get("content-type", "")
+    if content_type.startswith(ACCEPT["arrow"]):
+        import pyarrow as pa
+        return pa.ipc.open_stream(response.content).read_all()
+    if content_type.startswith(ACCEPT["msgpack"]):
+        import msgpack
+        return msgpack.unpackb(response.content)
+    return response.json()
+
+def to_frame(pages):
+    if pages and not isinstance(pages[0], list):
+        import pyarrow as pa
+        return pa.concat_tables(pages, promote_options="default").to_pandas()
+    return pd.DataFrame.from_records([record for page in pages for record in page])
+
+
+async def fetch_records(client, entity, limit=None, params=None):
+    """
+    Walk an entity's keyset pages (see X-Next-After-Id in main.py) and return
+    them decoded. Pages of one entity follow each other; different entities
+    run concurrently.
+    """
+    path = f"/{entity}" if "/" in entity else f"/{entity}/"
+    pages = []
+    fetched = 0
+    after_id = 0
+    while limit is None or fetched < limit:
+        page_size = PAGE_SIZE if limit is None else min(PAGE_SIZE, limit - fetched)
+        query = dict(params or {}, after_id=after_id, limit=page_size)
+        response = await get_with_retries(client, path, query)
+        page = decode_page(response)
+        pages.append(page)
+        fetched += len(page)
+        next_after_id = response.headers.get("X-Next-After-Id")
+        if next_after_id is None:
+            break
+        after_id = int(next_after_id)
+    return pages
+
+
+async def fetch_frames(*entities, limit=None, params=None, api_url=API_URL, max_connections=MAX_CONNECTIONS, fmt="json"):
+    """Fetch several entities (or views, e.g. "views/bookings-enriched") concurrently as DataFrames."""
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    headers = {"Accept": ACCEPT[fmt]}
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=30.0, headers=headers) as client:
+        results = await asyncio.gather(*(fetch_records(client, e, limit, params) for e in entities))
+    return {entity: to_frame(pages) for entity, pages in zip(entities, results)}
+
+
+def load_frames(*entities, **kwargs):
+    """Blocking wrapper around fetch_frames for scripts."""
+    return asyncio.run(fetch_frames(*entities, **kwargs))
@@ -1,20 +1,36 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, EmailStr
-from typing import List
-from passlib.context import CryptContext
-import json
+from pydantic import BaseModel, EmailStr, Field, ValidationError
+from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import os
-from datetime import datetime, timedelta
-import pandas as pd
-import httpx
+from datetime import date, datetime, timedelta
 import math
+import csv
+import io
+import json
+from storage import ConstraintError, Inserts, Store
+from availability import IntervalIndex, as_naive_utc
+from writer import GroupCommitter
+from passwords import VerificationCache, get_password_hash, verify_password, shutdown_pool
+from serialization import MEDIA_TYPES, RecordEncoder, dumps, negotiate_format
+from hostelstats import MAX_SERIES_DAYS
+from httpcache import ResponseCache, etag_for, etag_matches
+import metrics
+from compression import CompressionMiddleware
 
 # Constants
 # SECRET_KEY = os.getenv("SECRET_KEY", "default_secret")
 # ALGORITHM = "HS256"
 # ACCESS_TOKEN_EXPIRE_MINUTES = 30
-DB_FILE = "database.json"
+DB_FILE = os.getenv("DB_FILE", "database.json")
+MAX_PAGE_SIZE = 1000
+EXPORT_CHUNK_SIZE = 1000
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_MAX_ERRORS = 100  # Rejected rows listed in an import summary; the rest are only counted
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")  # "json" or "sql" (see database.py)
+LIST_MAX_AGE = int(os.getenv("LIST_MAX_AGE", "0"))  # Seconds clients may reuse a list without revalidating
 
 # Initialize FastAPI app
 app = FastAPI(title="Hostel Management System API", description="API for managing hostels, rooms, and bookings")
@@ -28,10 +44,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# gzip/brotli as the client accepts (see compression.py)
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency and sizes, served at /metrics (see metrics.py)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Writes the store rejected, e.g. a duplicate that raced past a check
+@app.exception_handler(ConstraintError)
+def constraint_error(request: Request, exc: ConstraintError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
 
 # Pydantic models
+AVAILABLE_FLAG = ("Set by the hostel (PATCH /rooms/{id}) to list the room or take it off the market; "
+                  "unlisted rooms cannot be booked. Bookings do not change it; use /rooms/availability "
+                  "to find listed rooms free on given dates.")
+
 class UserBase(BaseModel):
     username: str
     email: EmailStr
@@ -39,6 +67,10 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
 class User(UserBase):
     id: int
 
@@ -67,9 +99,12 @@ class RoomBase(BaseModel):
 class RoomCreate(RoomBase):
     pass
 
+class RoomUpdate(BaseModel):
+    available: bool = Field(description=AVAILABLE_FLAG)
+
 class Room(RoomBase):
     id: int
-    available: bool
+    available: bool = Field(description=AVAILABLE_FLAG)
 
     class Config:
         orm_mode = True
@@ -90,21 +125,76 @@ class Booking(BookingBase):
     class Config:
         orm_mode = True
 
-# Utility functions
-def read_db():
-    with open(DB_FILE, "r") as f:
-        return json.load(f)
-
-def write_db(data):
-    with open(DB_FILE, "w") as f:
-        json.dump(data, f, indent=4)
-
-# Remove authentication for now
-def get_password_hash(password):
-    return pwd_context.hash(password)
+# Joined views (see views.py)
+class RoomWithHostel(BaseModel):
+    id: int
+    hostel_id: int
+    number: str
+    capacity: int
+    available: bool = Field(description=AVAILABLE_FLAG)
+    hostel_name: str
+    hostel_location: str
+    owner_id: int
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+class BookingEnriched(BaseModel):
+    id: int
+    room_id: int
+    guest_name: str
+    guest_email: EmailStr
+    check_in_date: datetime
+    check_out_date: datetime
+    length_of_stay: int
+    room_number: Optional[str] = None
+    capacity: Optional[int] = None
+    hostel_id: Optional[int] = None
+    hostel_name: Optional[str] = None
+
+# Hostel aggregates (see hostelstats.py)
+class HostelStatsSummary(BaseModel):
+    hostel_id: int
+    rooms: int
+    capacity: int
+    listed_rooms: int = Field(description="Rooms with the available flag set, booked or not")
+    bookings: int
+    booked_rooms: int
+    booked_nights: int
+    revenue: float
+    booked_today: int
+    occupancy_today: float
+
+class OccupancyDay(BaseModel):
+    date: date
+    booked_rooms: int
+    occupancy: float
+
+class HostelStats(HostelStatsSummary):
+    series: List[OccupancyDay]
+
+# Storage: database.json loaded once and kept in memory, or the SQL database
+if STORAGE_BACKEND == "sql":
+    from sqlstore import SQLStore
+    store = SQLStore()
+else:
+    store = Store(DB_FILE)
+store = metrics.Instrumented(store, "storage")
+
+# Read responses are encoded straight from stored records (see serialization.py)
+encoder = RecordEncoder({"hostels": Hostel, "rooms": Room, "bookings": Booking,
+                         "rooms-with-hostel": RoomWithHostel, "bookings-enriched": BookingEnriched},
+                        cache=STORAGE_BACKEND == "json")
+encoder = metrics.Instrumented(encoder, "serialization")
+
+# All writes go through one committer, which groups concurrent requests
+committer = GroupCommitter(store)
+
+@app.on_event("shutdown")
+def close_store():
+    store.close()
+    shutdown_pool()
+
+# Password hashing runs on a process pool (see passwords.py); logins that
+# succeeded recently are answered from this cache without running bcrypt
+login_cache = VerificationCache()
 
 # Utility function to serialize datetime objects
 def serialize_datetime(obj):
@@ -122,94 +212,489 @@ def clean_data(data):
         return None  # or replace with 0, depending on your requirement
     return data
 
+def records_response(collection, records, fields=None, headers=None, fmt="json"):
+    return Response(content=encoder.encode_as(fmt, collection, records, fields),
+                    media_type=MEDIA_TYPES[fmt], headers=headers)
+
+# Keyset pagination: returns records with id > after_id; when the page is full,
+# X-Next-After-Id carries the cursor for the next one. `fields` is a
+# comma-separated projection (id is always included).
+def paginate(collection, model, after_id, limit, fields, fmt="json", **filters):
+    names = None
+    if fields is not None:
+        names = ["id"] + [name for name in fields.split(",") if name and name != "id"]
+        unknown = [name for name in names if name not in model.model_fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    records = store.page(collection, after_id=after_id, limit=limit, **filters)
+    headers = {}
+    if limit is not None and len(records) == limit:
+        headers["X-Next-After-Id"] = str(records[-1]["id"])
+    return records_response(collection, records, names, headers, fmt)
+
+# List responses are cached by path, query and the versions of the collections
+# they read (see httpcache.py), and carry a strong ETag for If-None-Match.
+# The format negotiated from Accept is passed to ``build``.
+response_cache = ResponseCache()
+CACHE_CONTROL = f"public, max-age={LIST_MAX_AGE}, must-revalidate"
+
+def cached_response(request, collections, build):
+    fmt = negotiate_format(request.headers.get("accept"))
+    versions = tuple(store.version(collection) for collection in collections)
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())), fmt, versions)
+    cacheable = None not in versions  # The SQL backend has no local versions
+    entry = response_cache.get(key) if cacheable else None
+    if entry is None:
+        response = build(fmt)
+        body = bytes(response.body)
+        entry = (body, etag_for(body), {k: v for k, v in response.headers.items() if k.startswith("x-")})
+        if cacheable:
+            response_cache.put(key, entry)
+    body, etag, extra_headers = entry
+    headers = dict(extra_headers, **{"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Accept"})
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=MEDIA_TYPES[fmt], headers=headers)
+
+def view_response(view, rows, limit, fmt="json"):
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        headers["X-Next-After-Id"] = str(rows[-1]["id"])
+    return records_response(view, rows, headers=headers, fmt=fmt)
+
+def get_or_404(collection, record_id, detail):
+    record = store.get(collection, record_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=detail)
+    return Response(content=encoder.encode(collection, record), media_type="application/json")
+
+# Streaming export: rows are read from the store one chunk at a time, so
+# memory stays bounded whatever the collection size
+EXPORT_MODELS = {"hostels": Hostel, "rooms": Room, "bookings": Booking}
+EXPORT_FILTERS = {
+    "hostels": (),
+    "rooms": ("hostel_id", "available", "min_capacity"),
+    "bookings": ("room_id",),
+}
+
+def export_chunks(collection, offset, limit, filters):
+    after_id, skipped, sent = 0, 0, 0
+    while limit is None or sent < limit:
+        chunk = store.page(collection, after_id=after_id, limit=EXPORT_CHUNK_SIZE, **filters)
+        if not chunk:
+            return
+        after_id = chunk[-1]["id"]
+        rows = chunk
+        if skipped < offset:
+            drop = min(offset - skipped, len(rows))
+            skipped += drop
+            rows = rows[drop:]
+        if limit is not None:
+            rows = rows[:limit - sent]
+        if rows:
+            sent += len(rows)
+            yield rows
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+
+def ndjson_stream(collection, chunks):
+    for rows in chunks:
+        yield b"\n".join(encoder.encode(collection, row) for row in rows) + b"\n"
+
+def csv_stream(collection, chunks):
+    names = list(EXPORT_MODELS[collection].model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for rows in chunks:
+        writer.writerows([row.get(name) for name in names] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+# Bulk import: the body is read as a stream and handled IMPORT_CHUNK_SIZE
+# lines at a time, each chunk validated and committed on its own, so memory
+# does not depend on the upload size. One record per line, in NDJSON or CSV
+# with a header row.
+IMPORT_MODELS = {"hostels": HostelCreate, "rooms": RoomCreate}
+
+def parse_import_lines(fmt, header, lines):
+    """Yield ``(line number, dict or error message)`` for numbered raw lines."""
+    for line_no, line in lines:
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"Invalid JSON: {e}"
+                continue
+            yield line_no, record if isinstance(record, dict) else "Expected a JSON object"
+        else:
+            values = next(csv.reader([line.decode("utf-8", "replace")]))
+            if len(values) != len(header):
+                yield line_no, f"Expected {len(header)} fields, got {len(values)}"
+                continue
+            yield line_no, dict(zip(header, values))
+
+def import_chunk(entity, fmt, header, lines):
+    """Validate and commit one chunk; return ``(accepted, [(line number, error), ...])``."""
+    model = IMPORT_MODELS[entity]
+    valid, errors = [], []
+    for line_no, record in parse_import_lines(fmt, header, lines):
+        if isinstance(record, str):
+            errors.append((line_no, record))
+            continue
+        try:
+            valid.append((line_no, model.model_validate(record)))
+        except ValidationError as e:
+            error = e.errors()[0]
+            errors.append((line_no, f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"))
+
+    def transaction():
+        rows = valid
+        if entity == "rooms":
+            known = store.existing_ids("hostels", [row.hostel_id for _, row in valid])
+            rows = []
+            for line_no, row in valid:
+                if row.hostel_id in known:
+                    rows.append((line_no, row))
+                else:
+                    errors.append((line_no, f"hostel_id: Hostel {row.hostel_id} not found"))
+        if not rows:
+            return {}, 0
+        first_id = store.allocate_ids(entity, len(rows))
+        if entity == "rooms":
+            records = [{"id": first_id + i, "hostel_id": row.hostel_id, "number": row.number,
+                        "capacity": row.capacity, "available": True} for i, (_, row) in enumerate(rows)]
+        else:
+            records = [{"id": first_id + i, "name": row.name, "location": row.location, "owner_id": 1}
+                       for i, (_, row) in enumerate(rows)]
+        return Inserts({entity: records}), len(records)
+    accepted = committer.submit(transaction)
+    return accepted, sorted(errors)
+
 # API Endpoints
-@app.post("/signup/", response_model=User)
-def create_user(user: UserCreate):
-    db = read_db()
-    if any(u["email"] == user.email for u in db["users"]):
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def check_new_user(user: UserCreate):
+    # Usernames are unique in the SQL schema, so both backends enforce it
+    if store.find_user_by_email(user.email) is not None:
         raise HTTPException(status_code=400, detail="Email already registered")
-    
-    new_user = {
-        "id": len(db["users"]) + 1,
-        "username": user.username,
-        "email": user.email,
-        "hashed_password": get_password_hash(user.password)
-    }
-    db["users"].append(new_user)
-    write_db(db)
-    return new_user
+    if store.find_user_by_username(user.username) is not None:
+        raise HTTPException(status_code=400, detail="Username already taken")
 
-@app.post("/hostels/", response_model=List[Hostel])  # Updated to accept multiple hostels
-def create_hostels(hostels: List[HostelCreate]):  # Accepting a list of hostels
-    db = read_db()
-    new_hostels = []
-    for hostel in hostels:
-        new_hostel = {
-            "id": len(db["hostels"]) + 1,
-            "name": hostel.name,
-            "location": hostel.location,
-            "owner_id": 1  # Default owner as 1
+@app.post("/signup/", response_model=User)
+async def create_user(user: UserCreate):
+    await run_in_threadpool(check_new_user, user)  # A query on the SQL backend
+    with metrics.timed("bcrypt"):
+        hashed_password = await get_password_hash(user.password)  # Hash outside the writer
+
+    def transaction():
+        # Re-checked here in case a concurrent signup took them meanwhile
+        check_new_user(user)
+        new_user = {
+            "id": store.allocate_ids("users"),
+            "username": user.username,
+            "email": user.email,
+            "hashed_password": hashed_password
         }
-        db["hostels"].append(new_hostel)
-        new_hostels.append(new_hostel)
-    write_db(db)
-    return new_hostels
+        return Inserts(users=[new_user]), new_user
+    return await run_in_threadpool(committer.submit, transaction)
+
+@app.post("/login/", response_model=User)
+async def login(credentials: UserLogin):
+    user = await run_in_threadpool(store.find_user_by_email, credentials.email)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+    if not login_cache.check(credentials.email, credentials.password, user["hashed_password"]):
+        with metrics.timed("bcrypt"):
+            verified = await verify_password(credentials.password, user["hashed_password"])
+        if not verified:
+            raise HTTPException(status_code=401, detail="Incorrect email or password")
+        login_cache.add(credentials.email, credentials.password, user["hashed_password"])
+    return user
 
-@app.get("/hostels/", response_model=List[Hostel])  # Get all hostels without pagination
-def read_hostels():
-    db = read_db()
-    return db["hostels"]
+@app.post("/hostels/", response_model=List[Hostel])  # Updated to accept multiple hostels
+def create_hostels(hostels: List[HostelCreate]):  # Accepting a list of hostels
+    def transaction():
+        first_id = store.allocate_ids("hostels", len(hostels))
+        new_hostels = []
+        for i, hostel in enumerate(hostels):
+            new_hostel = {
+                "id": first_id + i,
+                "name": hostel.name,
+                "location": hostel.location,
+                "owner_id": 1  # Default owner as 1
+            }
+            new_hostels.append(new_hostel)
+        return Inserts(hostels=new_hostels), new_hostels
+    return committer.submit(transaction)
+
+@app.get("/hostels/", response_model=List[Hostel])
+def read_hostels(
+    request: Request,
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+):
+    return cached_response(request, ("hostels",), lambda fmt: paginate("hostels", Hostel, after_id, limit, fields, fmt))
+
+# Ranked, so pages go by offset; X-Next-Offset is set while more may follow
+@app.get("/hostels/search", response_model=List[Hostel])
+def search_hostels(
+    q: str = Query(..., min_length=1),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+):
+    hostels = store.search_hostels(q, offset=offset, limit=limit)
+    headers = {}
+    if len(hostels) == limit:
+        headers["X-Next-Offset"] = str(offset + limit)
+    return records_response("hostels", hostels, headers=headers)
+
+@app.get("/hostels/{hostel_id}", response_model=Hostel)
+def read_hostel(hostel_id: int):
+    return get_or_404("hostels", hostel_id, "Hostel not found")
+
+@app.get("/hostels/{hostel_id}/stats", response_model=HostelStats)
+def read_hostel_stats(
+    hostel_id: int,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+):
+    # Without from/to the series lists only the days that have bookings
+    if (from_date is None) != (to_date is None):
+        raise HTTPException(status_code=400, detail="Give both 'from' and 'to', or neither")
+    if from_date is not None and not 0 <= (to_date - from_date).days < MAX_SERIES_DAYS:
+        raise HTTPException(status_code=400, detail=f"'to' must be within {MAX_SERIES_DAYS} days after 'from'")
+    if store.get("hostels", hostel_id) is None:
+        raise HTTPException(status_code=404, detail="Hostel not found")
+    return Response(content=dumps(store.hostel_stats(hostel_id, from_date, to_date)), media_type="application/json")
+
+@app.get("/stats/hostels", response_model=List[HostelStatsSummary])
+def read_hostels_stats(
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    rows = store.hostel_stats_page(after_id=after_id, limit=limit)
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        headers["X-Next-After-Id"] = str(rows[-1]["hostel_id"])
+    return Response(content=dumps(rows), media_type="application/json", headers=headers)
 
 @app.post("/rooms/", response_model=List[Room])  # Updated to accept multiple rooms
 def create_rooms(rooms: List[RoomCreate]):  # Accepting a list of rooms
-    db = read_db()
-    new_rooms = []
-    for room in rooms:
-        new_room = {
-            "id": len(db["rooms"]) + 1,
-            "hostel_id": room.hostel_id,
-            "number": room.number,
-            "capacity": room.capacity,
-            "available": True
-        }
-        db["rooms"].append(new_room)
-        new_rooms.append(new_room)
-    write_db(db)
-    return new_rooms
-
-@app.get("/rooms/", response_model=List[Room])  # Get all rooms without pagination
-def read_rooms():
-    db = read_db()
-    return db["rooms"]
+    def transaction():
+        first_id = store.allocate_ids("rooms", len(rooms))
+        new_rooms = []
+        for i, room in enumerate(rooms):
+            new_room = {
+                "id": first_id + i,
+                "hostel_id": room.hostel_id,
+                "number": room.number,
+                "capacity": room.capacity,
+                "available": True
+            }
+            new_rooms.append(new_room)
+        return Inserts(rooms=new_rooms), new_rooms
+    return committer.submit(transaction)
+
+@app.get("/rooms/", response_model=List[Room])
+def read_rooms(
+    request: Request,
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    hostel_id: Optional[int] = None,
+    available: Optional[bool] = Query(None, description=AVAILABLE_FLAG),
+    min_capacity: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    return cached_response(request, ("rooms",), lambda fmt: paginate(
+        "rooms", Room, after_id, limit, fields, fmt, hostel_id=hostel_id, available=available, min_capacity=min_capacity))
+
+@app.get("/rooms/availability", response_model=List[Room])
+def read_room_availability(
+    from_date: datetime = Query(..., alias="from"),
+    to_date: datetime = Query(..., alias="to"),
+    hostel_id: Optional[int] = None,
+    min_capacity: Optional[int] = None,
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+):
+    if to_date <= from_date:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    rooms = store.available_rooms(from_date, to_date, after_id=after_id, limit=limit,
+                                  hostel_id=hostel_id, min_capacity=min_capacity)
+    headers = {}
+    if limit is not None and len(rooms) == limit:
+        headers["X-Next-After-Id"] = str(rooms[-1]["id"])
+    return records_response("rooms", rooms, headers=headers)
+
+@app.get("/rooms/{room_id}", response_model=Room)
+def read_room(room_id: int):
+    return get_or_404("rooms", room_id, "Room not found")
+
+@app.patch("/rooms/{room_id}", response_model=Room)
+def update_room(room_id: int, update: RoomUpdate):
+    def transaction():
+        room = store.get("rooms", room_id)
+        if room is None:
+            raise HTTPException(status_code=404, detail="Room not found")
+        room = dict(room, available=update.available)
+        return {"rooms": [room]}, room
+    return committer.submit(transaction)
 
 @app.post("/bookings/", response_model=List[Booking])  # Updated to accept multiple bookings
 def create_bookings(bookings: List[BookingCreate]):  # Accepting a list of bookings
-    db = read_db()
-    new_bookings = []
-    for booking in bookings:
-        room = next((r for r in db["rooms"] if r["id"] == booking.room_id and r["available"]), None)
-        if not room:
-            raise HTTPException(status_code=400, detail="Room is not available")
-        
-        room["available"] = False  # Mark room as booked
-        new_booking = {
-            "id": len(db["bookings"]) + 1,
-            "room_id": booking.room_id,
-            "guest_name": booking.guest_name,
-            "guest_email": booking.guest_email,
-            "check_in_date": booking.check_in_date.isoformat(),
-            "check_out_date": booking.check_out_date.isoformat()
-        }
-        db["bookings"].append(new_booking)
-        new_bookings.append(new_booking)
-    write_db(db)
-    return new_bookings
-
-@app.get("/bookings/", response_model=List[Booking])  # Get all bookings without pagination
-def read_bookings():
-    db = read_db()
-    bookings = db["bookings"]
-    for booking in bookings:
-        booking["check_in_date"] = datetime.fromisoformat(booking["check_in_date"])
-        booking["check_out_date"] = datetime.fromisoformat(booking["check_out_date"])
-    return bookings
+    dates = [(as_naive_utc(b.check_in_date), as_naive_utc(b.check_out_date)) for b in bookings]
+    if any(check_out <= check_in for check_in, check_out in dates):
+        raise HTTPException(status_code=400, detail="Check-out must be after check-in")
+
+    # Rejects the whole request if any booking is for an unlisted room or
+    # conflicts, with stored bookings or with an earlier one in the request;
+    # nothing is written in that case
+    def transaction():
+        first_id = store.allocate_ids("bookings", len(bookings))
+        batch = IntervalIndex()
+        new_bookings = []
+        for i, (booking, (check_in, check_out)) in enumerate(zip(bookings, dates)):
+            room = store.get("rooms", booking.room_id)
+            if (room is None or not room["available"]
+                    or not store.room_is_free(booking.room_id, check_in, check_out)
+                    or not batch.is_free(booking.room_id, check_in, check_out)):
+                raise HTTPException(status_code=400, detail="Room is not available")
+
+            batch.add(booking.room_id, check_in, check_out)
+            new_booking = {
+                "id": first_id + i,
+                "room_id": booking.room_id,
+                "guest_name": booking.guest_name,
+                "guest_email": booking.guest_email,
+                "check_in_date": check_in.isoformat(),
+                "check_out_date": check_out.isoformat()
+            }
+            new_bookings.append(new_booking)
+        return Inserts(bookings=new_bookings), new_bookings
+    return committer.submit(transaction)
+
+@app.get("/bookings/", response_model=List[Booking])
+def read_bookings(
+    request: Request,
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    room_id: Optional[int] = None,
+    fields: Optional[str] = None,
+):
+    # Dates are stored as ISO strings and go out unchanged
+    return cached_response(request, ("bookings",),
+                           lambda fmt: paginate("bookings", Booking, after_id, limit, fields, fmt, room_id=room_id))
+
+@app.get("/bookings/{booking_id}", response_model=Booking)
+def read_booking(booking_id: int):
+    return get_or_404("bookings", booking_id, "Booking not found")
+
+@app.get("/export/{entity}.{fmt}")
+def export_entity(
+    entity: str,
+    fmt: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    hostel_id: Optional[int] = None,
+    available: Optional[bool] = None,
+    min_capacity: Optional[int] = None,
+    room_id: Optional[int] = None,
+):
+    if entity not in EXPORT_MODELS or fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=404, detail="Unknown export")
+    given = {"hostel_id": hostel_id, "available": available, "min_capacity": min_capacity, "room_id": room_id}
+    given = {name: value for name, value in given.items() if value is not None}
+    unsupported = [name for name in given if name not in EXPORT_FILTERS[entity]]
+    if unsupported:
+        raise HTTPException(status_code=400, detail=f"Unsupported filters for {entity}: {', '.join(unsupported)}")
+
+    chunks = export_chunks(entity, offset, limit, given)
+    if fmt == "ndjson":
+        return StreamingResponse(ndjson_stream(entity, chunks), media_type="application/x-ndjson")
+    return StreamingResponse(csv_stream(entity, chunks), media_type="text/csv",
+                             headers={"Content-Disposition": f'attachment; filename="{entity}.csv"'})
+
+@app.post("/import/{entity}")
+async def import_entity(entity: str, request: Request, format: Optional[str] = None):
+    """
+    Stream NDJSON (the default) or CSV (``?format=csv`` or a text/csv body)
+    into hostels or rooms. Valid rows are committed chunk by chunk, so rows
+    accepted before a failure stay imported.
+    """
+    if entity not in IMPORT_MODELS:
+        raise HTTPException(status_code=404, detail="Unknown import")
+    fmt = format or ("csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson")
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+
+    summary = {"entity": entity, "accepted": 0, "rejected": 0, "chunks": 0, "errors": []}
+    header = None
+    lines = []
+    line_no = 0
+
+    async def flush():
+        accepted, errors = await run_in_threadpool(import_chunk, entity, fmt, header, lines)
+        summary["accepted"] += accepted
+        summary["rejected"] += len(errors)
+        summary["chunks"] += 1
+        room = IMPORT_MAX_ERRORS - len(summary["errors"])
+        summary["errors"].extend({"line": n, "error": error} for n, error in errors[:room])
+
+    def add_line(line):
+        nonlocal header, line_no
+        line_no += 1
+        line = line.rstrip(b"\r")
+        if not line.strip():
+            return
+        if fmt == "csv" and header is None:
+            header = next(csv.reader([line.decode("utf-8", "replace")]))
+            return
+        lines.append((line_no, line))
+
+    pending = b""
+    async for chunk in request.stream():
+        *complete, pending = (pending + chunk).split(b"\n")
+        for line in complete:
+            add_line(line)
+            if len(lines) >= IMPORT_CHUNK_SIZE:
+                await flush()
+                lines = []
+    add_line(pending)
+    if lines:
+        await flush()
+    if fmt == "csv" and header is None:
+        raise HTTPException(status_code=400, detail="CSV body has no header row")
+    return summary
+
+@app.get("/views/rooms-with-hostel", response_model=List[RoomWithHostel])
+def read_rooms_with_hostel(
+    request: Request,
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    hostel_id: Optional[int] = None,
+):
+    def build(fmt):
+        rows = store.view_page("rooms-with-hostel", after_id=after_id, limit=limit, hostel_id=hostel_id)
+        return view_response("rooms-with-hostel", rows, limit, fmt)
+    return cached_response(request, ("rooms", "hostels"), build)
+
+@app.get("/views/bookings-enriched", response_model=List[BookingEnriched])
+def read_bookings_enriched(
+    request: Request,
+    after_id: int = 0,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    hostel_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+):
+    def build(fmt):
+        rows = store.view_page("bookings-enriched", after_id=after_id, limit=limit, hostel_id=hostel_id, room_id=room_id)
+        return view_response("bookings-enriched", rows, limit, fmt)
+    return cached_response(request, ("bookings", "rooms", "hostels"), build)
@@ -0,0 +1,198 @@
+import bisect
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+# Request metrics in the Prometheus text format, served at /metrics by main.py
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+# Sampling profiler: off unless PROFILING=1. Then a request is profiled when
+# it sends "X-Profile: 1" or "?profile=1", or at random with PROFILE_SAMPLE_RATE
+PROFILING = os.getenv("PROFILING", "0") == "1"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = 0.001
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class Histogram:
+    def __init__(self, name, help, labelnames, buckets):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(labels, time.perf_counter() - start)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            label = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-2] + [values[-1] - sum(values[:-2])]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{label}{"," if label else ""}le="{bound}"}} {cumulative}')
+            braces = f"{{{label}}}" if label else ""
+            lines.append(f"{self.name}_sum{braces} {values[-2]}")
+            lines.append(f"{self.name}_count{braces} {values[-1]}")
+        return "\n".join(lines)
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "Time from request to the last response byte.",
+                            ("method", "route", "status"), LATENCY_BUCKETS)
+REQUEST_BYTES = Histogram("http_request_size_bytes", "Request body size.", ("method", "route"), SIZE_BUCKETS)
+RESPONSE_BYTES = Histogram("http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS)
+COMPONENT_SECONDS = Histogram("app_component_duration_seconds",
+                              "Time spent in storage, serialization and bcrypt calls.", ("component",), LATENCY_BUCKETS)
+HISTOGRAMS = (REQUEST_SECONDS, REQUEST_BYTES, RESPONSE_BYTES, COMPONENT_SECONDS)
+
+def render():
+    return "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+
+def timed(component):
+    """Context manager adding its duration to ``component``."""
+    return COMPONENT_SECONDS.time(component)
+
+
+class Instrumented:
+    """Proxy that times every method call on ``target`` as ``component``."""
+
+    def __init__(self, target, component):
+        self._target = target
+        self._component = component
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with COMPONENT_SECONDS.time(self._component):
+                return attr(*args, **kwargs)
+        return call
+
+
+class StackSampler:
+    """
+    Samples the stacks of every thread while a request runs, keeping those
+    that pass through this app's code, as collapsed stacks (``a;b;c count``)
+    for flame graph tools. Threadpool handlers are covered too, at the cost
+    of also catching concurrent requests.
+    """
+
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack, in_app = [], False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                if in_app:
+                    self.samples[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+_profile_lock = threading.Lock()  # One profile at a time
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency and sizes per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wants_profile(self, scope):
+        if not PROFILING:
+            return False
+        if (b"x-profile", b"1") in scope["headers"] or b"profile=1" in scope["query_string"].split(b"&"):
+            return True
+        return random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        sizes = {"request": 0, "response": 0}
+        status = [500]
+        sampler, profile_name = None, None
+        if self._wants_profile(scope) and _profile_lock.acquire(blocking=False):
+            profile_name = f"{time.time():.6f}-{scope['method']}-{scope['path'].strip('/').replace('/', '_')}.txt"
+            sampler = StackSampler()
+            sampler.start()
+
+        async def counting_receive():
+            message = await receive()
+            sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if profile_name is not None:
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-file", profile_name.encode())]
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            route = scope.get("route")
+            route = route.path if route is not None else "<unmatched>"  # Keeps label cardinality bounded
+            REQUEST_SECONDS.observe((scope["method"], route, str(status[0])), time.perf_counter() - start)
+            REQUEST_BYTES.observe((scope["method"], route), sizes["request"])
+            RESPONSE_BYTES.observe((scope["method"], route), sizes["response"])
+            if sampler is not None:
+                try:
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    with open(os.path.join(PROFILE_DIR, profile_name), "w") as f:
+                        f.write(sampler.stop())
+                finally:
+                    _profile_lock.release()
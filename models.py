@@ -0,0 +1,50 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Float, Boolean, DateTime
+from sqlalchemy.orm import relationship
+from database import Base
+
+# SQLAlchemy models matching the API schema in main.py
+
+class User(Base):
+    __tablename__ = "users"
+    id = Column(Integer, primary_key=True)
+    username = Column(String(255), unique=True, nullable=False)
+    email = Column(String(255), unique=True, nullable=False)  # The unique constraint doubles as the email index
+    hashed_password = Column(String(255), nullable=False)
+
+class Hostel(Base):
+    __tablename__ = "hostels"
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False, index=True)
+    location = Column(String(255), nullable=False)
+    owner_id = Column(Integer, nullable=False, default=1)
+    rooms = relationship("Room", back_populates="hostel")
+
+class Room(Base):
+    __tablename__ = "rooms"
+    id = Column(Integer, primary_key=True)
+    hostel_id = Column(Integer, ForeignKey("hostels.id"), nullable=False, index=True)
+    number = Column(String(50), nullable=False)
+    capacity = Column(Integer, nullable=False)
+    available = Column(Boolean, nullable=False, default=True)
+    # Filled in by gendata.py; not part of the API models
+    room_type = Column(String(50))
+    price = Column(Float)
+    hostel = relationship("Hostel", back_populates="rooms")
+    bookings = relationship("Booking", back_populates="room")
+
+class Booking(Base):
+    __tablename__ = "bookings"
+    id = Column(Integer, primary_key=True)
+    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False, index=True)
+    guest_name = Column(String(255), nullable=False)
+    guest_email = Column(String(255), nullable=False)
+    check_in_date = Column(DateTime, nullable=False)
+    check_out_date = Column(DateTime, nullable=False)
+    room = relationship("Room", back_populates="bookings")
+
+class IdSequence(Base):
+    __tablename__ = "id_sequences"
+    name = Column(String(50), primary_key=True)  # Table name
+    value = Column(Integer, nullable=False)  # Last id handed out
+
+MODELS = {"users": User, "hostels": Hostel, "rooms": Room, "bookings": Booking}
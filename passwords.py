@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from passlib.context import CryptContext
+
+# bcrypt cost factor for new hashes; existing hashes keep the cost they were made with
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+LOGIN_CACHE_TTL = float(os.getenv("LOGIN_CACHE_TTL", "300"))
+LOGIN_CACHE_SIZE = 10_000
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# These run in the worker processes
+def _hash(password):
+    return pwd_context.hash(password)
+
+def _verify(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+        return _pool
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+            _pool = None
+
+
+async def get_password_hash(password):
+    return await asyncio.get_running_loop().run_in_executor(get_pool(), _hash, password)
+
+async def verify_password(plain_password, hashed_password):
+    return await asyncio.get_running_loop().run_in_executor(get_pool(), _verify, plain_password, hashed_password)
+
+
+class VerificationCache:
+    """
+    Remembers successful password checks for ``ttl`` seconds so repeated
+    logins skip bcrypt. Entries are keyed by an HMAC of email and password
+    under a per-process secret, and only match while the stored hash is
+    unchanged.
+    """
+
+    def __init__(self, ttl=LOGIN_CACHE_TTL, max_size=LOGIN_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._secret = secrets.token_bytes(32)
+        self._entries = OrderedDict()  # key -> (hashed_password, expires_at)
+        self._lock = threading.Lock()
+
+    def _key(self, email, password):
+        return hmac.new(self._secret, f"{email}\0{password}".encode(), hashlib.sha256).digest()
+
+    def check(self, email, password, hashed_password):
+        key = self._key(email, password)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            if entry[1] < time.monotonic() or entry[0] != hashed_password:
+                del self._entries[key]
+                return False
+            return True
+
+    def add(self, email, password, hashed_password):
+        key = self._key(email, password)
+        with self._lock:
+            self._entries[key] = (hashed_password, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
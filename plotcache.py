@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+
+class PlotCache:
+    """
+    Content-addressed cache of rendered plots.
+
+    Plots are stored as ``<plot>-<digest>.png`` where the digest covers the
+    bytes of the input file and the plot parameters, so unchanged data maps
+    to the same files. The input file is only re-hashed when its size or
+    mtime changes. Files on disk are evicted least-recently-used beyond
+    ``max_files``, and recently served PNGs are kept in memory up to
+    ``max_memory_bytes``.
+    """
+
+    def __init__(self, directory, max_files=256, max_memory_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_memory_bytes = max_memory_bytes
+        self._file_hashes = {}  # (path, size, mtime_ns) -> sha256 of the contents
+        self._manifests = {}  # digest -> plot file names
+        self._memory = OrderedDict()  # (path, size, mtime_ns) -> (bytes, etag)
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def _stat_key(self, path):
+        st = os.stat(path)
+        return (path, st.st_size, st.st_mtime_ns)
+
+    def _file_hash(self, path):
+        key = self._stat_key(path)
+        file_hash = self._file_hashes.get(key)
+        if file_hash is None:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(block)
+            file_hash = h.hexdigest()
+            self._file_hashes[key] = file_hash
+        return file_hash
+
+    def digest(self, data_path, params):
+        key = self._file_hash(data_path) + json.dumps(params, sort_keys=True)
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    def _manifest_path(self, digest):
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def _cached(self, digest):
+        names = self._manifests.get(digest)
+        if names is None and os.path.exists(self._manifest_path(digest)):
+            with open(self._manifest_path(digest)) as f:
+                names = json.load(f)
+        if names is None or not all(os.path.exists(os.path.join(self.directory, n)) for n in names):
+            return None
+        self._manifests[digest] = names
+        return names
+
+    def lookup(self, data_path, params):
+        """Return ``(digest, plot paths)``, with paths None on a miss."""
+        os.makedirs(self.directory, exist_ok=True)
+        digest = self.digest(data_path, params)
+        names = self._cached(digest)
+        if names is None:
+            return digest, None
+        try:
+            for name in names + [f"{digest}.json"]:
+                os.utime(os.path.join(self.directory, name))  # Mark as recently used
+        except FileNotFoundError:  # Evicted meanwhile
+            return digest, None
+        return digest, [os.path.join(self.directory, name) for name in names]
+
+    def current(self, data_path, params, name):
+        """
+        Path of the rendered plot ``name`` (e.g. ``"hist.png"``) for the data
+        and parameters as they are now, or None if they were not rendered.
+        """
+        if not os.path.isfile(data_path):
+            return None
+        digest, paths = self.lookup(data_path, params)
+        stem, ext = os.path.splitext(name)
+        path = os.path.join(self.directory, f"{stem}-{digest}{ext}")
+        return path if paths is not None and path in paths else None
+
+    def path_template(self, digest):
+        """Where a renderer should write each plot: ``template.format(plot=name)``."""
+        return os.path.join(self.directory, "{plot}-" + digest + ".png")
+
+    def record(self, digest, plots):
+        """Register the plots rendered for ``digest`` and return their paths."""
+        names = [f"{plot}-{digest}.png" for plot in plots]
+        with open(self._manifest_path(digest), "w") as f:
+            json.dump(names, f)
+        with self._lock:
+            self._manifests[digest] = names
+            self._evict()
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _evict(self):
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".png")]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime_ns)
+        for entry in entries[:len(entries) - self.max_files]:
+            os.remove(entry.path)
+
+    def read(self, path):
+        """Return ``(bytes, etag)`` for a file, from memory when possible."""
+        key = self._stat_key(path)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+        with open(path, "rb") as f:
+            content = f.read()
+        entry = (content, '"' + hashlib.sha256(content).hexdigest()[:32] + '"')
+        with self._lock:
+            if key not in self._memory:
+                self._memory[key] = entry
+                self._memory_bytes += len(content)
+            while self._memory_bytes > self.max_memory_bytes and self._memory:
+                _, (old, _) = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old)
+        return entry
@@ -1,12 +1,16 @@
 import os
 import pandas as pd
+from datasetstats import DatasetStats
 
 # Use the absolute path
 file_path = os.path.join(os.getcwd(), "ml.csv")
 
-# Read the CSV file into a dataframe
-df = pd.read_csv(file_path)
-
-# Generate summary statistics
-summary = df.describe()
+# Generate summary statistics without loading the whole file (see datasetstats.py)
+stats = DatasetStats(file_path)
+stats.refresh()
+summary = pd.DataFrame({
+    column: {"count": s["count"], "mean": s["mean"], "std": s["std"], "min": s["min"],
+             **s["quantiles"], "max": s["max"]}
+    for column, s in stats.to_dict()["columns"].items() if s["type"] == "numeric"
+})
 print(summary)
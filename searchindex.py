@@ -0,0 +1,113 @@
+import bisect
+import heapq
+import re
+import unicodedata
+
+FIELD_WEIGHTS = {"name": 2.0, "location": 1.0}
+MAX_PREFIX_EXPANSIONS = 100  # Vocabulary tokens one query term may expand to
+MIN_SIMILARITY = 0.5  # Trigram (Dice) similarity for a fuzzy match
+
+
+def tokenize(text):
+    """Lowercase words with accents stripped."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    return re.findall(r"\w+", "".join(c for c in text if not unicodedata.combining(c)))
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Inverted index over some text fields of a collection.
+
+    A query term matches a vocabulary token exactly, as a prefix (found by
+    bisecting the sorted vocabulary) or, for terms of 3+ characters, by
+    trigram similarity when nothing matches by prefix, so typos still find
+    something. Each record scores the best match per term, weighted by
+    field, summed over terms.
+    """
+
+    def __init__(self, fields=FIELD_WEIGHTS):
+        self.fields = fields
+        self._postings = {}  # token -> {record id: field weight}
+        self._vocabulary = []  # Sorted tokens
+        self._trigrams = {}  # trigram -> tokens containing it
+        self._token_trigrams = {}  # token -> number of trigrams
+
+    def _tokens(self, record):
+        weights = {}
+        for field, weight in self.fields.items():
+            for token in tokenize(record.get(field) or ""):
+                weights[token] = max(weights.get(token, 0.0), weight)
+        return weights
+
+    def add(self, record):
+        for token, weight in self._tokens(record).items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+                grams = trigrams(token)
+                self._token_trigrams[token] = len(grams)
+                for gram in grams:
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings[record["id"]] = weight
+
+    def remove(self, record):
+        for token in self._tokens(record):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(record["id"], None)
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+                del self._token_trigrams[token]
+                for gram in trigrams(token):
+                    self._trigrams[gram].discard(token)
+
+    def update(self, previous, record):
+        if previous is not None:
+            self.remove(previous)
+        self.add(record)
+
+    def _expand(self, term):
+        """Vocabulary tokens matching a query term, with a match quality in (0, 1]."""
+        matches = {}
+        i = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[i:i + MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            matches[token] = 1.0 if token == term else 0.5 + 0.5 * len(term) / len(token)
+        if not matches and len(term) >= 3:
+            grams = trigrams(term)
+            shared = {}
+            for gram in grams:
+                for token in self._trigrams.get(gram, ()):
+                    shared[token] = shared.get(token, 0) + 1
+            for token, count in shared.items():
+                similarity = 2 * count / (len(grams) + self._token_trigrams[token])
+                if similarity >= MIN_SIMILARITY:
+                    matches[token] = 0.5 * similarity
+        return matches
+
+    def search(self, query, offset=0, limit=None):
+        """Ids of matching records, best first (ties by id)."""
+        scores = {}
+        for term in set(tokenize(query)):
+            best = {}
+            for token, quality in self._expand(term).items():
+                for record_id, weight in self._postings[token].items():
+                    score = quality * weight
+                    if score > best.get(record_id, 0.0):
+                        best[record_id] = score
+            for record_id, score in best.items():
+                scores[record_id] = scores.get(record_id, 0.0) + score
+        key = lambda item: (-item[1], item[0])
+        if limit is None:
+            ranked = sorted(scores.items(), key=key)
+        else:
+            ranked = heapq.nsmallest(offset + limit, scores.items(), key=key)
+        return [record_id for record_id, _ in ranked[offset:]]
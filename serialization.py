@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:  # orjson is optional; fall back to the standard library
+    import json
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+
+# Formats a list response can be sent in, by media type. msgpack and Arrow
+# are imported on first use.
+MEDIA_TYPES = {
+    "json": "application/json",
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+ACCEPTED_MEDIA_TYPES = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "arrow",
+}
+
+def negotiate_format(accept):
+    """The format for an Accept header: msgpack or Arrow when asked for, JSON otherwise."""
+    for part in (accept or "").split(","):
+        fmt = ACCEPTED_MEDIA_TYPES.get(part.split(";")[0].strip().lower())
+        if fmt is not None:
+            return fmt
+    return "json"
+
+
+class RecordEncoder:
+    """
+    Encodes stored records straight to JSON bytes, projected onto the fields
+    of their response model. Records were validated when they were written,
+    so they are not validated again on the way out.
+
+    With ``cache=True`` the bytes are kept per record, least recently used
+    first out beyond ``max_cache_bytes``. The in-memory store replaces a
+    record's dict whenever it changes, so an entry is only reused while it
+    still belongs to the very same dict.
+    """
+
+    def __init__(self, models, cache=True, max_cache_bytes=64 * 1024 * 1024):
+        self.fields = {collection: tuple(model.model_fields) for collection, model in models.items()}
+        self.cache = cache
+        self.max_cache_bytes = max_cache_bytes
+        self._encoded = OrderedDict()  # (collection, id) -> (record, bytes)
+        self._encoded_bytes = 0
+        self._lock = threading.Lock()
+
+    def encode(self, collection, record):
+        key = (collection, record["id"])
+        if self.cache:
+            with self._lock:
+                entry = self._encoded.get(key)
+                if entry is not None and entry[0] is record:
+                    self._encoded.move_to_end(key)
+                    return entry[1]
+        encoded = dumps({name: record.get(name) for name in self.fields[collection]})
+        if self.cache:
+            with self._lock:
+                previous = self._encoded.pop(key, None)
+                if previous is not None:
+                    self._encoded_bytes -= len(previous[1])
+                self._encoded[key] = (record, encoded)
+                self._encoded_bytes += len(encoded)
+                while self._encoded_bytes > self.max_cache_bytes:
+                    _, (_, old) = self._encoded.popitem(last=False)
+                    self._encoded_bytes -= len(old)
+        return encoded
+
+    def encode_many(self, collection, records, fields=None):
+        """Encode records as a JSON array, optionally projected onto ``fields``."""
+        if fields is None:
+            parts = [self.encode(collection, record) for record in records]
+        else:
+            parts = [dumps({name: record.get(name) for name in fields}) for record in records]
+        return b"[" + b",".join(parts) + b"]"
+
+    def encode_as(self, fmt, collection, records, fields=None):
+        """Encode records as JSON, a msgpack array of maps, or an Arrow IPC stream."""
+        if fmt == "json":
+            return self.encode_many(collection, records, fields)
+        fields = fields or self.fields[collection]
+        if fmt == "msgpack":
+            import msgpack
+            return msgpack.packb([{name: record.get(name) for name in fields} for record in records])
+        import pyarrow as pa
+        table = pa.table({name: [record.get(name) for record in records] for name in fields})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
@@ -1,43 +1,36 @@
-import httpx
-import pandas as pd
-
-# Constants
-API_URL_ROOMS = "http://localhost:8000/rooms/"  # Change to your FastAPI server URL for rooms
-API_URL_HOSTELS = "http://localhost:8000/hostels/"  # Change to your FastAPI server URL for hostels
-
-# Step 1: Fetch data from the /rooms API and save the first 50 rows to a CSV
-def rooms_to_csv():
-    response = httpx.get(API_URL_ROOMS)
-    rooms = response.json()
-    df_rooms = pd.DataFrame(rooms)
-    df_rooms_first_50 = df_rooms.head(50)  # Take the first 50 rows
-    df_rooms_first_50.to_csv('rooms_first_50.csv', index=False)
-    print("First 50 rooms saved to rooms_first_50.csv")
-
-# Step 2: Fetch data from the /hostels API and save the first 50 rows to a CSV
-def hostels_to_csv():
-    response = httpx.get(API_URL_HOSTELS)
-    hostels = response.json()
-    df_hostels = pd.DataFrame(hostels)
-    df_hostels_first_50 = df_hostels.head(50)  # Take the first 50 rows
-    df_hostels_first_50.to_csv('hostels_first_50.csv', index=False)
-    print("First 50 hostels saved to hostels_first_50.csv")
-
-# Step 3: Concatenate the rooms and hostels CSV files to create one big CSV
-def concatenate_csv():
-    # Read the CSVs into DataFrames
-    df_rooms = pd.read_csv('rooms_first_50.csv')
-    df_hostels = pd.read_csv('hostels_first_50.csv')
-
-    # Merge the DataFrames on a common column, e.g., 'hostel_id'
-    # Ensure that 'hostel_id' is present in both DataFrames
-    df_merged = pd.merge(df_rooms, df_hostels, left_on='hostel_id', right_on='id', how='inner')
-
-    # Save the merged DataFrame back to a CSV
-    df_merged.to_csv('rooms_and_hostels_merged.csv', index=False)
-    print("CSV files concatenated and saved to rooms_and_hostels_merged.csv")
+from ingest import load_frames  # API_URL is configured in ingest.py
+from columnar import write_frame
+
+# Intermediate files are Arrow/Feather (see columnar.py)
+
+# Step 1: Save the first 50 rooms
+def rooms_to_feather(df_rooms_first_50):
+    write_frame(df_rooms_first_50, 'rooms_first_50.feather')
+    print("First 50 rooms saved to rooms_first_50.feather")
+
+# Step 2: Save the first 50 hostels
+def hostels_to_feather(df_hostels_first_50):
+    write_frame(df_hostels_first_50, 'hostels_first_50.feather')
+    print("First 50 hostels saved to hostels_first_50.feather")
+
+# Steps 1 and 2: Fetch the first 50 rooms and hostels from the API concurrently
+def fetch_first_50():
+    frames = load_frames("rooms", "hostels", limit=50)
+    rooms_to_feather(frames["rooms"])
+    hostels_to_feather(frames["hostels"])
+    return frames["rooms"], frames["hostels"]
+
+# Step 3: Join the rooms and hostels into one big file
+def concatenate_files():
+    # The API serves rooms already joined with their hostel (see views.py)
+    df_merged = load_frames("views/rooms-with-hostel", limit=50)["views/rooms-with-hostel"]
+
+    # Save the merged DataFrame
+    write_frame(df_merged, 'rooms_and_hostels_merged.feather')
+    print("Files joined and saved to rooms_and_hostels_merged.feather")
+    return df_merged
 
 # Run all steps
 
-# hostels_to_csv()
-# concatenate_csv()
+# df_rooms, df_hostels = fetch_first_50()
+# concatenate_files()
@@ -0,0 +1,281 @@
+from datetime import datetime
+from sqlalchemy import DateTime, case, exists, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from availability import as_naive_utc
+from hostelstats import HostelTotals
+from searchindex import SearchIndex, tokenize
+from storage import ConstraintError, Inserts
+from database import SessionLocal, engine
+from models import MODELS, IdSequence
+from views import booking_enriched, room_with_hostel
+
+
+def _datetime_columns(model):
+    return [c.name for c in model.__table__.columns if isinstance(c.type, DateTime)]
+
+DATETIME_COLUMNS = {name: _datetime_columns(model) for name, model in MODELS.items()}
+
+
+class SQLStore:
+    """
+    Store backed by the SQLAlchemy models in models.py.
+
+    Exposes the same interface as storage.Store so main.py can switch
+    backends with STORAGE_BACKEND=sql. Records go in and come out as plain
+    dicts with dates as ISO strings.
+    """
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+
+    def _to_record(self, collection, row):
+        record = {c.name: getattr(row, c.name) for c in row.__table__.columns}
+        for name in DATETIME_COLUMNS[collection]:
+            if record[name] is not None:
+                record[name] = record[name].isoformat()
+        return record
+
+    def _to_row(self, collection, record):
+        row = dict(record)
+        for name in DATETIME_COLUMNS[collection]:
+            if isinstance(row.get(name), str):
+                row[name] = datetime.fromisoformat(row[name])
+        return row
+
+    # Reads
+    def get(self, collection, record_id):
+        with self.session_factory() as session:
+            row = session.get(MODELS[collection], record_id)
+            return self._to_record(collection, row) if row is not None else None
+
+    def all(self, collection):
+        model = MODELS[collection]
+        with self.session_factory() as session:
+            rows = session.scalars(select(model).order_by(model.id))
+            return [self._to_record(collection, row) for row in rows]
+
+    def count(self, collection):
+        with self.session_factory() as session:
+            return session.scalar(select(func.count()).select_from(MODELS[collection]))
+
+    def version(self, collection):
+        # Other processes write to the same database, so there is no local
+        # version to cache against
+        return None
+
+    def existing_ids(self, collection, ids):
+        model = MODELS[collection]
+        with self.session_factory() as session:
+            return set(session.scalars(select(model.id).where(model.id.in_(set(ids)))))
+
+    def find_user_by_email(self, email):
+        model = MODELS["users"]
+        with self.session_factory() as session:
+            row = session.scalars(select(model).where(model.email == email)).first()
+            return self._to_record("users", row) if row is not None else None
+
+    def find_user_by_username(self, username):
+        model = MODELS["users"]
+        with self.session_factory() as session:
+            row = session.scalars(select(model).where(model.username == username)).first()
+            return self._to_record("users", row) if row is not None else None
+
+    def rooms_in_hostel(self, hostel_id):
+        model = MODELS["rooms"]
+        with self.session_factory() as session:
+            rows = session.scalars(select(model).where(model.hostel_id == hostel_id).order_by(model.id))
+            return [self._to_record("rooms", row) for row in rows]
+
+    def page(self, collection, after_id=0, limit=None, min_capacity=None, **equals):
+        model = MODELS[collection]
+        query = select(model).where(model.id > after_id)
+        if min_capacity is not None:
+            query = query.where(model.capacity >= min_capacity)
+        for field, value in equals.items():
+            if value is not None:
+                query = query.where(getattr(model, field) == value)
+        query = query.order_by(model.id).limit(limit)
+        with self.session_factory() as session:
+            return [self._to_record(collection, row) for row in session.scalars(query)]
+
+    def _overlapping(self, check_in, check_out):
+        booking = MODELS["bookings"]
+        return (booking.check_in_date < as_naive_utc(check_out)) & (booking.check_out_date > as_naive_utc(check_in))
+
+    def room_is_free(self, room_id, check_in, check_out):
+        booking = MODELS["bookings"]
+        query = select(exists().where((booking.room_id == room_id) & self._overlapping(check_in, check_out)))
+        with self.session_factory() as session:
+            return not session.scalar(query)
+
+    def available_rooms(self, check_in, check_out, after_id=0, limit=None, hostel_id=None, min_capacity=None):
+        room, booking = MODELS["rooms"], MODELS["bookings"]
+        booked = exists().where((booking.room_id == room.id) & self._overlapping(check_in, check_out))
+        query = select(room).where(room.id > after_id, room.available, ~booked)
+        if hostel_id is not None:
+            query = query.where(room.hostel_id == hostel_id)
+        if min_capacity is not None:
+            query = query.where(room.capacity >= min_capacity)
+        query = query.order_by(room.id).limit(limit)
+        with self.session_factory() as session:
+            return [self._to_record("rooms", row) for row in session.scalars(query)]
+
+    def view_page(self, view, after_id=0, limit=None, hostel_id=None, room_id=None):
+        """Joined views (see views.py), answered with indexed joins."""
+        room, hostel, booking = MODELS["rooms"], MODELS["hostels"], MODELS["bookings"]
+        if view == "rooms-with-hostel":
+            query = select(room, hostel).join(hostel, room.hostel_id == hostel.id).where(room.id > after_id)
+            if hostel_id is not None:
+                query = query.where(room.hostel_id == hostel_id)
+            query = query.order_by(room.id).limit(limit)
+            with self.session_factory() as session:
+                return [room_with_hostel(self._to_record("rooms", r), self._to_record("hostels", h))
+                        for r, h in session.execute(query)]
+
+        query = (
+            select(booking, room, hostel)
+            .outerjoin(room, booking.room_id == room.id)
+            .outerjoin(hostel, room.hostel_id == hostel.id)
+            .where(booking.id > after_id)
+        )
+        if hostel_id is not None:
+            query = query.where(room.hostel_id == hostel_id)
+        if room_id is not None:
+            query = query.where(booking.room_id == room_id)
+        query = query.order_by(booking.id).limit(limit)
+        with self.session_factory() as session:
+            return [
+                booking_enriched(
+                    self._to_record("bookings", b),
+                    self._to_record("rooms", r) if r is not None else None,
+                    self._to_record("hostels", h) if h is not None else None,
+                )
+                for b, r, h in session.execute(query)
+            ]
+
+    def search_hostels(self, query, offset=0, limit=None):
+        """
+        Hostels containing any query term, ranked like the in-memory index.
+        Substring matching stands in for the trigram matches.
+        """
+        hostel = MODELS["hostels"]
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+        matches = [func.lower(column).contains(term, autoescape=True)
+                   for term in terms for column in (hostel.name, hostel.location)]
+        with self.session_factory() as session:
+            records = {row.id: self._to_record("hostels", row) for row in session.scalars(select(hostel).where(or_(*matches)))}
+        index = SearchIndex()
+        for record in records.values():
+            index.add(record)
+        return [records[hostel_id] for hostel_id in index.search(query, offset, limit)]
+
+    def _hostel_totals(self, session, hostel_ids):
+        # Room counters are aggregated by the database; bookings are bucketed
+        # into days here, which keeps the date arithmetic portable
+        room, booking = MODELS["rooms"], MODELS["bookings"]
+        totals = {hostel_id: HostelTotals() for hostel_id in hostel_ids}
+        room_counts = (
+            select(room.hostel_id, func.count(), func.sum(room.capacity), func.sum(case((room.available, 1), else_=0)))
+            .where(room.hostel_id.in_(hostel_ids))
+            .group_by(room.hostel_id)
+        )
+        for hostel_id, rooms, capacity, available in session.execute(room_counts):
+            totals[hostel_id].rooms, totals[hostel_id].capacity, totals[hostel_id].listed_rooms = rooms, capacity, available
+        bookings = select(booking, room).join(room, booking.room_id == room.id).where(room.hostel_id.in_(hostel_ids))
+        for b, r in session.execute(bookings):
+            totals[r.hostel_id].add_booking(self._to_record("bookings", b), self._to_record("rooms", r))
+        return totals
+
+    def hostel_stats(self, hostel_id, start=None, end=None):
+        with self.session_factory() as session:
+            totals = self._hostel_totals(session, [hostel_id])[hostel_id]
+        return dict(totals.summary(hostel_id), series=totals.series(start, end))
+
+    def hostel_stats_page(self, after_id=0, limit=None):
+        hostel = MODELS["hostels"]
+        with self.session_factory() as session:
+            hostel_ids = list(session.scalars(select(hostel.id).where(hostel.id > after_id).order_by(hostel.id).limit(limit)))
+            totals = self._hostel_totals(session, hostel_ids)
+        return [totals[hostel_id].summary(hostel_id) for hostel_id in hostel_ids]
+
+    # Ids
+    def allocate_ids(self, collection, count=1):
+        """
+        Reserve ``count`` consecutive ids from id_sequences and return the
+        first one. Ids start above the highest stored id, in case rows were
+        added without advancing the sequence.
+        """
+        model = MODELS[collection]
+        max_id = select(func.coalesce(func.max(model.id), 0)).scalar_subquery()
+        with self.session_factory() as session, session.begin():
+            value = session.scalar(
+                update(IdSequence)
+                .where(IdSequence.name == collection)
+                .values(value=case((IdSequence.value > max_id, IdSequence.value), else_=max_id) + count)
+                .returning(IdSequence.value)
+            )
+            if value is None:
+                # Databases created with create_all() start without a sequence row
+                value = session.scalar(select(max_id)) + count
+                session.add(IdSequence(name=collection, value=value))
+        return value - count + 1
+
+    # Writes
+    def write(self, changes):
+        """
+        Upsert ``{collection: [record, ...]}`` in a single transaction, using
+        bulk INSERT for new ids and bulk UPDATE by primary key for the rest;
+        Inserts are only inserted. Raises ConstraintError if the database
+        rejects the transaction.
+        """
+        try:
+            with self.session_factory() as session, session.begin():
+                if changes.get("bookings"):
+                    self._check_bookings(session, changes["bookings"])
+                for collection, records in changes.items():
+                    if not records:
+                        continue
+                    model = MODELS[collection]
+                    rows = [self._to_row(collection, r) for r in records]
+                    if isinstance(changes, Inserts):
+                        session.execute(insert(model), rows)
+                        continue
+                    existing = set(session.scalars(select(model.id).where(model.id.in_([r["id"] for r in rows]))))
+                    new_rows = [r for r in rows if r["id"] not in existing]
+                    old_rows = [r for r in rows if r["id"] in existing]
+                    if new_rows:
+                        session.execute(insert(model), new_rows)
+                    if old_rows:
+                        session.execute(update(model), old_rows)
+        except IntegrityError as e:
+            raise ConstraintError("Conflicts with existing data") from e
+
+    def _check_bookings(self, session, bookings):
+        # Other processes write to the same database, so the overlap check
+        # main.py made in its own session may be stale. Touching the rooms
+        # first locks them (row locks, or SQLite's write lock) until commit,
+        # so the check and the insert below cannot interleave with another
+        # booking of the same rooms
+        room, booking = MODELS["rooms"], MODELS["bookings"]
+        room_ids = {b["room_id"] for b in bookings}
+        session.execute(update(room).where(room.id.in_(room_ids)).values(available=room.available))
+        for b in bookings:
+            overlapping = select(exists().where(
+                (booking.room_id == b["room_id"]) & (booking.id != b["id"])
+                & self._overlapping(b["check_in_date"], b["check_out_date"])
+            ))
+            if session.scalar(overlapping):
+                raise ConstraintError("Room is not available")
+
+    # The database does its own group commit, so staged changes are
+    # committed right away and commit() has nothing left to do
+    def stage(self, changes):
+        self.write(changes)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        engine.dispose()
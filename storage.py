@@ -0,0 +1,469 @@
+import bisect
+import heapq
+import json
+import os
+import threading
+try:
+    import fcntl
+except ImportError:  # Not on Windows; the single-process check is skipped there
+    fcntl = None
+from availability import IntervalIndex, as_naive_utc
+from hostelstats import HostelStats
+from searchindex import SearchIndex
+from views import JoinedViews, ids_after
+
+COLLECTIONS = ("users", "hostels", "rooms", "bookings")
+
+
+class ConstraintError(ValueError):
+    """A write broke a uniqueness or foreign key constraint of the backend."""
+
+
+class Inserts(dict):
+    """
+    Changes that only create records. Writing one whose id is already
+    stored raises ConstraintError instead of replacing the stored record.
+    """
+
+
+def _insert_sorted(ids, record_id):
+    # Ids are normally handed out in increasing order, so this is an append
+    if not ids or ids[-1] < record_id:
+        ids.append(record_id)
+    else:
+        bisect.insort(ids, record_id)
+
+
+def _ids_in_buckets(buckets, after_id):
+    # Merges sorted id lists; a room moving between buckets can briefly sit in both
+    for record_id in heapq.merge(*(ids_after(ids, after_id) for ids in buckets)):
+        if record_id > after_id:
+            after_id = record_id
+            yield record_id
+
+
+def _relist_booked_rooms(snapshot):
+    # Snapshots written before sequences were saved come from the version
+    # that cleared "available" when a room was booked. Bookings now live in
+    # the interval index, and the flag only says whether a room is listed
+    booked = {booking["room_id"] for booking in snapshot.get("bookings", [])}
+    for room in snapshot.get("rooms", []):
+        if not room["available"] and room["id"] in booked:
+            room["available"] = True
+
+
+class Store:
+    """
+    In-memory copy of database.json that writes through an append-only log.
+
+    The snapshot is parsed once at startup. Every write is appended to
+    ``<path>.log`` and fsync'd, and a background thread folds the log back
+    into the snapshot once it grows past ``compact_threshold`` entries.
+    Staged changes are visible before they are durable; if the commit
+    fails they are rolled back.
+
+    Only one process may open a database at a time (``<path>.lock`` is held
+    while it is open), so serve it with a single worker.
+    """
+
+    def __init__(self, path, compact_threshold=1000):
+        self.path = path
+        self.log_path = path + ".log"
+        self.lock_path = path + ".lock"
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._tables = {name: {} for name in COLLECTIONS}
+        self._ids = {name: [] for name in COLLECTIONS}  # Sorted ids, for keyset pagination
+        self._users_by_email = {}
+        self._users_by_username = {}
+        self._rooms_by_hostel = {}
+        self._rooms_by_listing = {}  # (available, capacity) -> sorted room ids
+        self._bookings_by_room = {}
+        self._booked = IntervalIndex()
+        self._sequences = {name: 0 for name in COLLECTIONS}  # Last id handed out
+        self._versions = {name: 0 for name in COLLECTIONS}  # Bumped on every write
+        self._views = JoinedViews(self)
+        self._stats = HostelStats(self)
+        self._hostel_search = SearchIndex()
+        self._staged = []
+        self._undo = []  # (collection, id, previous record or None) for each staged record
+        self._log = None
+        self._log_entries = 0
+        self._compaction = None
+        self._lock_file = None
+        self.load()
+
+    # Loading and recovery
+    def _acquire_file_lock(self):
+        # A lock file rather than the log, which compaction replaces
+        self._lock_file = open(self.lock_path, "a")
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"{self.path} is in use by another process; the JSON backend serves one "
+                               "process only (use STORAGE_BACKEND=sql for several workers)") from None
+
+    def load(self):
+        with self._lock:
+            if self._lock_file is None:
+                self._acquire_file_lock()
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    snapshot = json.load(f)
+                if "sequences" not in snapshot:
+                    _relist_booked_rooms(snapshot)
+                for name in COLLECTIONS:
+                    for record in snapshot.get(name, []):
+                        self._put(name, record)
+                self._advance_sequences(snapshot.get("sequences", {}))
+
+            # A leftover ".old" log means a compaction did not finish
+            replayed = 0
+            for path in (self.log_path + ".old", self.log_path):
+                replayed += self._replay(path)
+
+            if replayed:
+                self._write_snapshot(self._copy_tables())
+            for path in (self.log_path + ".old", self.log_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._log = open(self.log_path, "a")
+
+    def _replay(self, path):
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Torn final write; everything before it is intact
+                self._apply(entry["changes"])
+                self._advance_sequences(entry.get("sequences", {}))
+                count += 1
+        return count
+
+    # Reads
+    def get(self, collection, record_id):
+        return self._tables[collection].get(record_id)
+
+    def all(self, collection):
+        return list(self._tables[collection].values())
+
+    def count(self, collection):
+        return len(self._tables[collection])
+
+    def version(self, collection):
+        """Changes whenever ``collection`` is written to."""
+        return self._versions[collection]
+
+    def existing_ids(self, collection, ids):
+        """The subset of ``ids`` that are stored in ``collection``."""
+        table = self._tables[collection]
+        return {record_id for record_id in ids if record_id in table}
+
+    def find_user_by_email(self, email):
+        return self._users_by_email.get(email)
+
+    def find_user_by_username(self, username):
+        return self._users_by_username.get(username)
+
+    def rooms_in_hostel(self, hostel_id):
+        table = self._tables["rooms"]
+        return [table[room_id] for room_id in self._rooms_by_hostel.get(hostel_id, ())]
+
+    def page(self, collection, after_id=0, limit=None, min_capacity=None, **equals):
+        """
+        Records with ``id > after_id`` in id order, filtered by field equality
+        and ``capacity >= min_capacity``. ``hostel_id`` on rooms and
+        ``room_id`` on bookings walk their secondary index instead of the
+        whole collection, and so do ``available`` and ``min_capacity`` on
+        rooms, through buckets of rooms with the same flag and capacity.
+        """
+        table = self._tables[collection]
+        if collection == "rooms" and equals.get("hostel_id") is not None:
+            walk = ids_after(self._rooms_by_hostel.get(equals["hostel_id"], []), after_id)
+        elif collection == "rooms" and (min_capacity is not None or equals.get("available") is not None):
+            available = equals.get("available")
+            buckets = [ids for (flag, capacity), ids in list(self._rooms_by_listing.items())
+                       if (available is None or flag == available)
+                       and (min_capacity is None or capacity >= min_capacity)]
+            walk = _ids_in_buckets(buckets, after_id)
+        elif collection == "bookings" and equals.get("room_id") is not None:
+            walk = ids_after(self._bookings_by_room.get(equals["room_id"], []), after_id)
+        else:
+            walk = ids_after(self._ids[collection], after_id)
+        equals = [(field, value) for field, value in equals.items() if value is not None]
+
+        results = []
+        for record_id in walk:
+            record = table.get(record_id)
+            if record is None:  # Rolled back after its id was read
+                continue
+            if min_capacity is not None and record["capacity"] < min_capacity:
+                continue
+            if any(record[field] != value for field, value in equals):
+                continue
+            results.append(record)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def room_is_free(self, room_id, check_in, check_out):
+        return self._booked.is_free(room_id, as_naive_utc(check_in), as_naive_utc(check_out))
+
+    def available_rooms(self, check_in, check_out, after_id=0, limit=None, hostel_id=None, min_capacity=None):
+        """Listed rooms with no booking overlapping [check_in, check_out), in id order."""
+        check_in, check_out = as_naive_utc(check_in), as_naive_utc(check_out)
+        results = []
+        while limit is None or len(results) < limit:
+            chunk = self.page("rooms", after_id=after_id, limit=1000, hostel_id=hostel_id,
+                              min_capacity=min_capacity, available=True)
+            for room in chunk:
+                if self._booked.is_free(room["id"], check_in, check_out):
+                    results.append(room)
+                    if limit is not None and len(results) >= limit:
+                        break
+            if len(chunk) < 1000:
+                break
+            after_id = chunk[-1]["id"]
+        return results
+
+    def view_page(self, view, after_id=0, limit=None, **equals):
+        """Rows of a joined view (see views.py) with ``id > after_id``."""
+        return self._views.page(view, after_id=after_id, limit=limit, **equals)
+
+    def search_hostels(self, query, offset=0, limit=None):
+        """Hostels matching ``query`` on name and location, best first (see searchindex.py)."""
+        table = self._tables["hostels"]
+        return [table[hostel_id] for hostel_id in self._hostel_search.search(query, offset, limit)]
+
+    def hostel_stats(self, hostel_id, start=None, end=None):
+        """Occupancy and revenue of a hostel, with rooms booked per day (see hostelstats.py)."""
+        return self._stats.get(hostel_id, start, end)
+
+    def hostel_stats_page(self, after_id=0, limit=None):
+        """Stats summaries of hostels with ``id > after_id``, in id order."""
+        return self._stats.page(after_id=after_id, limit=limit)
+
+    # Ids
+    def allocate_ids(self, collection, count=1):
+        """
+        Reserve ``count`` consecutive ids and return the first one. Ids are
+        never reused, even if the write that reserved them is rejected.
+        """
+        with self._lock:
+            first = self._sequences[collection] + 1
+            self._sequences[collection] += count
+            return first
+
+    def _advance_sequences(self, sequences):
+        for name, value in sequences.items():
+            self._sequences[name] = max(self._sequences[name], value)
+
+    # Writes
+    def write(self, changes):
+        """
+        Durably apply ``{collection: [record, ...]}`` as one log entry.
+        Records are upserted by ``id``.
+        """
+        with self._lock:
+            self.stage(changes)
+            self.commit()
+
+    def stage(self, changes):
+        """Apply changes in memory; they reach the log on the next commit()."""
+        with self._lock:
+            if isinstance(changes, Inserts):
+                for name, records in changes.items():
+                    clashes = self.existing_ids(name, [record["id"] for record in records])
+                    if clashes or len({record["id"] for record in records}) < len(records):
+                        raise ConstraintError(f"{name}: ids already in use: {sorted(clashes)}")
+            for name, records in changes.items():
+                table = self._tables[name]
+                self._undo.extend((name, record["id"], table.get(record["id"])) for record in records)
+            self._apply(changes)
+            self._staged.append(changes)
+
+    def commit(self):
+        """
+        Append everything staged as a single fsync'd log entry. If that
+        fails, the staged changes are rolled back and the error re-raised.
+        """
+        with self._lock:
+            if not self._staged:
+                return
+            merged = {}
+            for changes in self._staged:
+                for name, records in changes.items():
+                    merged.setdefault(name, []).extend(records)
+            offset = self._log.tell()
+            try:
+                self._log.write(json.dumps({"changes": merged, "sequences": self._sequences}) + "\n")
+                self._log.flush()
+                os.fsync(self._log.fileno())
+            except BaseException:
+                self._rollback(offset)
+                raise
+            self._staged, self._undo = [], []
+            self._log_entries += 1
+            if self._log_entries >= self.compact_threshold:
+                self._start_compaction()
+
+    def _rollback(self, offset):
+        # Cut off whatever part of the entry reached the log, so a restart
+        # does not replay it, then restore the records it would have written
+        try:
+            self._log.close()
+            with open(self.log_path, "r+") as f:
+                f.truncate(offset)
+        finally:
+            self._log = open(self.log_path, "a")
+        for name, record_id, previous in reversed(self._undo):
+            if previous is None:
+                self._delete(name, record_id)
+            else:
+                self._put(name, previous)
+        # Versions move forward again rather than back: responses cached
+        # while the changes were visible must not match a later version
+        for name in {name for name, _, _ in self._undo}:
+            self._versions[name] += 1
+        # Sequences stay where they are: ids are not reused (see allocate_ids)
+        self._staged, self._undo = [], []
+
+    def _apply(self, changes):
+        for name, records in changes.items():
+            for record in records:
+                self._put(name, record)
+            self._versions[name] += 1
+
+    def _put(self, collection, record):
+        table = self._tables[collection]
+        previous = table.get(record["id"])
+        table[record["id"]] = record
+        if previous is None:
+            _insert_sorted(self._ids[collection], record["id"])
+            if record["id"] > self._sequences[collection]:
+                self._sequences[collection] = record["id"]
+        self._index(collection, previous, record)
+        if collection == "hostels":
+            self._views.hostel_changed(record)
+            self._hostel_search.update(previous, record)
+        elif collection == "rooms":
+            self._views.room_changed(record)
+            self._stats.room_changed(previous, record)
+        elif collection == "bookings":
+            self._views.booking_changed(record)
+            self._stats.booking_changed(previous, record)
+
+    def _delete(self, collection, record_id):
+        # Only used to roll back inserts, so nothing refers to the record any more.
+        # Unlocked readers walk the id lists, so ids go before the record does
+        record = self._tables[collection][record_id]
+        ids = self._ids[collection]
+        del ids[bisect.bisect_left(ids, record_id)]
+        if collection == "rooms":
+            self._rooms_by_hostel[record["hostel_id"]].remove(record_id)
+            self._rooms_by_listing[(record["available"], record["capacity"])].remove(record_id)
+        elif collection == "bookings":
+            self._bookings_by_room[record["room_id"]].remove(record_id)
+        del self._tables[collection][record_id]
+        if collection == "users":
+            self._users_by_email.pop(record["email"], None)
+            self._users_by_username.pop(record["username"], None)
+        elif collection == "hostels":
+            self._views.hostel_changed(record)
+            self._hostel_search.remove(record)
+        elif collection == "rooms":
+            self._views.room_removed(record)
+            self._stats.room_removed(record)
+        elif collection == "bookings":
+            self._booked.remove(record["room_id"], as_naive_utc(record["check_in_date"]),
+                                as_naive_utc(record["check_out_date"]))
+            self._views.booking_removed(record)
+            self._stats.booking_removed(record)
+
+    def _index(self, collection, previous, record):
+        if collection == "users":
+            if previous is not None:
+                self._users_by_email.pop(previous["email"], None)
+                self._users_by_username.pop(previous["username"], None)
+            self._users_by_email[record["email"]] = record
+            self._users_by_username[record["username"]] = record
+        elif collection == "rooms":
+            listing = (record["available"], record["capacity"])
+            if previous is None or (previous["available"], previous["capacity"]) != listing:
+                # Listed in the new bucket first, so readers never miss the room
+                _insert_sorted(self._rooms_by_listing.setdefault(listing, []), record["id"])
+                if previous is not None:
+                    self._rooms_by_listing[(previous["available"], previous["capacity"])].remove(record["id"])
+            if previous is not None and previous["hostel_id"] == record["hostel_id"]:
+                return
+            if previous is not None:
+                self._rooms_by_hostel[previous["hostel_id"]].remove(record["id"])
+            _insert_sorted(self._rooms_by_hostel.setdefault(record["hostel_id"], []), record["id"])
+        elif collection == "bookings":
+            if previous is not None:
+                self._booked.remove(previous["room_id"], as_naive_utc(previous["check_in_date"]),
+                                    as_naive_utc(previous["check_out_date"]))
+            self._booked.add(record["room_id"], as_naive_utc(record["check_in_date"]),
+                             as_naive_utc(record["check_out_date"]))
+            if previous is not None and previous["room_id"] == record["room_id"]:
+                return
+            if previous is not None:
+                self._bookings_by_room[previous["room_id"]].remove(record["id"])
+            _insert_sorted(self._bookings_by_room.setdefault(record["room_id"], []), record["id"])
+
+    # Compaction
+    def _copy_tables(self):
+        snapshot = {name: [dict(r) for r in table.values()] for name, table in self._tables.items()}
+        snapshot["sequences"] = dict(self._sequences)
+        return snapshot
+
+    def _start_compaction(self):
+        # Called with the lock held
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._log.close()
+        old_path = self.log_path + ".old"
+        if os.path.exists(old_path):
+            # A previous compaction failed; keep its entries ahead of ours
+            with open(old_path, "a") as old, open(self.log_path, "r") as log:
+                old.write(log.read())
+            os.remove(self.log_path)
+        else:
+            os.replace(self.log_path, old_path)
+        self._log = open(self.log_path, "a")
+        self._log_entries = 0
+
+        snapshot = self._copy_tables()
+        self._compaction = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+        self._compaction.start()
+
+    def _compact(self, snapshot):
+        self._write_snapshot(snapshot)
+        os.remove(self.log_path + ".old")
+
+    def _write_snapshot(self, snapshot):
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        if self._compaction is not None:
+            self._compaction.join()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if self._lock_file is not None:
+                self._lock_file.close()  # Releases the flock
+                self._lock_file = None
@@ -0,0 +1,97 @@
+from datetime import datetime
+import pytest
+from availability import IntervalIndex, as_naive_utc
+from storage import Store
+
+
+def day(n, hour=12):
+    return datetime(2030, 1, n, hour)
+
+
+def test_as_naive_utc_converts_offsets():
+    assert as_naive_utc("2030-01-01T14:00:00+02:00") == datetime(2030, 1, 1, 12)
+    assert as_naive_utc(day(1)) == day(1)
+
+
+@pytest.mark.parametrize("start, end, free", [
+    (day(1), day(3), True),   # Ends as the booking starts
+    (day(7), day(9), True),   # Starts as the booking ends
+    (day(2), day(4), False),  # Overlaps the start
+    (day(6), day(8), False),  # Overlaps the end
+    (day(4), day(5), False),  # Inside
+    (day(1), day(9), False),  # Around
+])
+def test_overlaps_are_half_open(start, end, free):
+    index = IntervalIndex()
+    index.add(1, day(3), day(7))
+    assert index.is_free(1, start, end) is free
+    assert index.is_free(2, start, end)
+
+
+def test_gaps_between_bookings():
+    index = IntervalIndex()
+    for start, end in ((day(10), day(12)), (day(1), day(3)), (day(5), day(7))):
+        index.add(1, start, end)
+    assert index.is_free(1, day(3), day(5))
+    assert index.is_free(1, day(7), day(10))
+    assert not index.is_free(1, day(7), day(11))
+    index.remove(1, day(5), day(7))
+    assert index.is_free(1, day(3), day(10))
+    assert not index.is_free(1, day(2), day(10))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "database.json"))
+    store.write({
+        "hostels": [{"id": 1, "name": "Harbour House", "location": "Port Lake", "owner_id": 1}],
+        "rooms": [{"id": i, "hostel_id": 1, "number": str(i), "capacity": i, "available": i != 3} for i in (1, 2, 3)],
+        "bookings": [{"id": 1, "room_id": 1, "guest_name": "Ann", "guest_email": "ann@example.com",
+                      "check_in_date": day(3).isoformat(), "check_out_date": day(7).isoformat()}],
+    })
+    yield store
+    store.close()
+
+
+def test_available_rooms_skip_booked_and_unlisted_rooms(store):
+    assert [room["id"] for room in store.available_rooms(day(4), day(5))] == [2]
+    assert [room["id"] for room in store.available_rooms(day(7), day(9))] == [1, 2]
+    assert [room["id"] for room in store.available_rooms(day(7), day(9), min_capacity=2)] == [2]
+    assert not store.room_is_free(1, "2030-01-06T00:00:00+00:00", day(9))
+
+
+def test_moved_booking_frees_its_old_dates(store):
+    booking = dict(store.get("bookings", 1), check_in_date=day(20).isoformat(), check_out_date=day(22).isoformat())
+    store.write({"bookings": [booking]})
+    assert store.room_is_free(1, day(3), day(7))
+    assert not store.room_is_free(1, day(21), day(23))
+
+
+def test_legacy_snapshot_relists_booked_rooms(tmp_path):
+    path = tmp_path / "database.json"
+    path.write_text(
+        '{"users": [], "hostels": [], "rooms": ['
+        '{"id": 1, "hostel_id": 1, "number": "1", "capacity": 1, "available": false},'
+        '{"id": 2, "hostel_id": 1, "number": "2", "capacity": 1, "available": false}],'
+        '"bookings": [{"id": 1, "room_id": 1, "guest_name": "Ann", "guest_email": "ann@example.com",'
+        '"check_in_date": "2030-01-03T12:00:00", "check_out_date": "2030-01-07T12:00:00"}]}'
+    )
+    store = Store(str(path))
+    try:
+        assert store.get("rooms", 1)["available"] is True
+        assert store.get("rooms", 2)["available"] is False
+    finally:
+        store.close()
+
+
+def test_room_filters_follow_flag_and_capacity_changes(store):
+    def ids(**filters):
+        return [room["id"] for room in store.page("rooms", **filters)]
+    assert ids(available=True) == [1, 2]
+    assert ids(available=False) == [3]
+    assert ids(min_capacity=2) == [2, 3]
+    assert ids(min_capacity=2, available=True, after_id=1) == [2]
+    store.write({"rooms": [dict(store.get("rooms", 1), capacity=5, available=False)]})
+    assert ids(available=False) == [1, 3]
+    assert ids(min_capacity=4) == [1]
+    assert ids(available=True) == [2]
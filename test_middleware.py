@@ -0,0 +1,43 @@
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+import metrics
+from compression import CompressionMiddleware
+from httpcache import etag_for, etag_matches
+
+BODY = b"[" + b",".join(b'{"id": %d}' % i for i in range(200)) + b"]"
+ETAG = etag_for(BODY)
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
+@app.get("/rooms/")
+def rooms(request: Request):
+    if etag_matches(request.headers.get("if-none-match"), ETAG):
+        return Response(status_code=304, headers={"ETag": ETAG})
+    return Response(BODY, media_type="application/json", headers={"ETag": ETAG})
+
+@app.get("/small")
+def small():
+    return {"ok": True}
+
+client = TestClient(app)
+
+
+def test_conditional_get_keeps_route_label():
+    response = client.get("/rooms/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == ETAG[:-1] + '-gzip"'
+
+    revalidated = client.get("/rooms/", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == response.headers["etag"]
+    rendered = metrics.render()
+    assert 'http_request_duration_seconds_count{method="GET",route="/rooms/",status="304"} 1' in rendered
+    assert 'route="<unmatched>"' not in rendered
+
+
+def test_small_responses_are_not_compressed():
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert response.json() == {"ok": True}
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,112 @@
+import pytest
+import storage
+from storage import ConstraintError, Inserts, Store
+from views import ids_after
+from writer import GroupCommitter
+
+HOSTEL = {"id": 1, "name": "Harbour House", "location": "Port Lake", "owner_id": 1}
+ROOM = {"id": 1, "hostel_id": 1, "number": "101", "capacity": 2, "available": True, "price": 30.0}
+BOOKING = {"id": 1, "room_id": 1, "guest_name": "Ann", "guest_email": "ann@example.com",
+           "check_in_date": "2030-01-01T14:00:00", "check_out_date": "2030-01-03T10:00:00"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "database.json"))
+    store.write({"hostels": [HOSTEL], "rooms": [ROOM]})
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def failing_fsync(monkeypatch):
+    def fsync(fd):
+        raise OSError("disk full")
+    monkeypatch.setattr(storage.os, "fsync", fsync)
+
+
+def insert_ghost(store):
+    first_id = store.allocate_ids("hostels")
+    ghost = {"id": first_id, "name": "Ghost Lodge", "location": "Nowhere", "owner_id": 1}
+    booking = dict(BOOKING, id=store.allocate_ids("bookings"))
+    return {"hostels": [ghost], "bookings": [booking]}, ghost
+
+
+def test_failed_commit_rolls_back_inserts(store, failing_fsync):
+    committer = GroupCommitter(store)
+    versions = {name: store.version(name) for name in ("hostels", "bookings")}
+
+    with pytest.raises(OSError):
+        committer.submit(lambda: insert_ghost(store))
+
+    assert store.get("hostels", 2) is None
+    assert store.get("bookings", 1) is None
+    assert store.search_hostels("ghost") == []
+    assert store.view_page("bookings-enriched") == []
+    assert store.room_is_free(1, BOOKING["check_in_date"], BOOKING["check_out_date"])
+    assert store.hostel_stats(1)["bookings"] == 0
+    # The ids the failed group reserved are not handed out again
+    assert store.allocate_ids("hostels") == 3
+    assert store.allocate_ids("bookings") == 2
+    # Moved on, so nothing cached while the insert was visible is reused
+    assert all(store.version(name) > version for name, version in versions.items())
+
+
+def test_failed_commit_restores_updated_records(store, failing_fsync):
+    moved = dict(ROOM, hostel_id=2, price=50.0)
+    store.stage({"hostels": [dict(HOSTEL, id=2, name="Annex")], "rooms": [moved]})
+    with pytest.raises(OSError):
+        store.commit()
+
+    assert store.get("rooms", 1) == ROOM
+    assert store.rooms_in_hostel(1) == [ROOM]
+    assert store.view_page("rooms-with-hostel")[0]["hostel_name"] == HOSTEL["name"]
+    assert store.hostel_stats(1)["rooms"] == 1
+    assert store.hostel_stats(2)["rooms"] == 0
+
+
+def test_failed_commit_is_not_replayed(store, monkeypatch, tmp_path):
+    calls = []
+
+    def fsync(fd):
+        calls.append(fd)
+        raise OSError("disk full")
+    monkeypatch.setattr(storage.os, "fsync", fsync)
+    with pytest.raises(OSError):
+        GroupCommitter(store).submit(lambda: insert_ghost(store))
+    assert calls
+    monkeypatch.undo()
+
+    # The next group commits normally, and only it survives a restart
+    store.write({"hostels": [dict(HOSTEL, id=store.allocate_ids("hostels"), name="Second")]})
+    store.close()
+    reopened = Store(store.path)
+    try:
+        assert [hostel["name"] for hostel in reopened.all("hostels")] == [HOSTEL["name"], "Second"]
+        assert reopened.all("bookings") == []
+    finally:
+        reopened.close()
+
+
+def test_inserts_never_replace_stored_records(store):
+    with pytest.raises(ConstraintError):
+        store.stage(Inserts(rooms=[dict(ROOM, number="x")]))
+    assert store.get("rooms", 1) == ROOM
+    store.write(Inserts(rooms=[dict(ROOM, id=2)]))
+    assert store.get("rooms", 2)["number"] == ROOM["number"]
+
+
+def test_second_process_cannot_open_the_database(store):
+    with pytest.raises(RuntimeError, match="in use"):
+        Store(store.path)
+    store.close()
+    Store(store.path).close()
+
+
+def test_ids_after_survives_concurrent_changes():
+    ids = [1, 2, 4, 5]
+    walk = ids_after(ids, 0)
+    assert next(walk) == 1
+    ids.insert(0, 0)   # Shifts every id right under the walk
+    ids.remove(4)
+    assert list(walk) == [2, 5]
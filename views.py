@@ -0,0 +1,118 @@
+import bisect
+from availability import as_naive_utc
+
+VIEWS = ("rooms-with-hostel", "bookings-enriched")
+
+
+def ids_after(ids, after_id):
+    """
+    Walk a sorted id list from ``after_id`` on. Pages are read without a
+    lock, so the list may grow or shrink meanwhile; that never raises here.
+    """
+    while True:
+        # Searching again each step keeps the walk in order even if ids shifted
+        try:
+            row_id = ids[bisect.bisect_right(ids, after_id)]
+        except IndexError:
+            return
+        if row_id <= after_id:  # An insert shifted the list between search and read
+            continue
+        after_id = row_id
+        yield row_id
+
+
+def room_with_hostel(room, hostel):
+    return {
+        "id": room["id"],
+        "hostel_id": room["hostel_id"],
+        "number": room["number"],
+        "capacity": room["capacity"],
+        "available": room["available"],
+        "hostel_name": hostel["name"],
+        "hostel_location": hostel["location"],
+        "owner_id": hostel["owner_id"],
+    }
+
+def booking_enriched(booking, room, hostel):
+    check_in = as_naive_utc(booking["check_in_date"])
+    check_out = as_naive_utc(booking["check_out_date"])
+    return {
+        "id": booking["id"],
+        "room_id": booking["room_id"],
+        "guest_name": booking["guest_name"],
+        "guest_email": booking["guest_email"],
+        "check_in_date": booking["check_in_date"],
+        "check_out_date": booking["check_out_date"],
+        "length_of_stay": (check_out - check_in).days,
+        "room_number": room["number"] if room else None,
+        "capacity": room["capacity"] if room else None,
+        "hostel_id": room["hostel_id"] if room else None,
+        "hostel_name": hostel["name"] if hostel else None,
+    }
+
+
+class JoinedViews:
+    """
+    Materialized joins over an in-memory Store, maintained on every write.
+
+    ``rooms-with-hostel`` is rooms inner-joined with their hostel;
+    ``bookings-enriched`` is every booking left-joined with its room and
+    hostel, plus ``length_of_stay`` in days. A write only rebuilds the rows
+    that depend on the changed record.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._rows = {name: {} for name in VIEWS}
+        self._ids = {name: [] for name in VIEWS}
+
+    def _set(self, view, row_id, row):
+        # page() reads without a lock, so an id is only listed while its row exists
+        rows, ids = self._rows[view], self._ids[view]
+        if row is None:
+            if row_id in rows:
+                del ids[bisect.bisect_left(ids, row_id)]
+                del rows[row_id]
+            return
+        new = row_id not in rows
+        rows[row_id] = row
+        if new:
+            bisect.insort(ids, row_id)
+
+    def hostel_changed(self, hostel):
+        for room in self.store.rooms_in_hostel(hostel["id"]):
+            self.room_changed(room)
+
+    def room_changed(self, room):
+        hostel = self.store.get("hostels", room["hostel_id"])
+        self._set("rooms-with-hostel", room["id"], room_with_hostel(room, hostel) if hostel else None)
+        for booking in self.store.page("bookings", room_id=room["id"]):
+            self.booking_changed(booking)
+
+    def room_removed(self, room):
+        self._set("rooms-with-hostel", room["id"], None)
+        for booking in self.store.page("bookings", room_id=room["id"]):
+            self.booking_changed(booking)
+
+    def booking_removed(self, booking):
+        self._set("bookings-enriched", booking["id"], None)
+
+    def booking_changed(self, booking):
+        room = self.store.get("rooms", booking["room_id"])
+        hostel = self.store.get("hostels", room["hostel_id"]) if room else None
+        self._set("bookings-enriched", booking["id"], booking_enriched(booking, room, hostel))
+
+    def page(self, view, after_id=0, limit=None, **equals):
+        rows, ids = self._rows[view], self._ids[view]
+        equals = [(field, value) for field, value in equals.items() if value is not None]
+        results = []
+        for row_id in ids_after(ids, after_id):
+            row = rows.get(row_id)
+            if row is None:  # Removed after its id was read
+                continue
+            if any(row[field] != value for field, value in equals):
+                continue
+            results.append(row)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,66 @@
+import threading
+
+
+class _Pending:
+    __slots__ = ("transaction", "result", "error", "done")
+
+    def __init__(self, transaction):
+        self.transaction = transaction
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class GroupCommitter:
+    """
+    Single-writer pipeline for store mutations.
+
+    A transaction is a function that reads the store and returns
+    ``(changes, result)``, or raises to reject itself without writing
+    anything. Whichever thread holds the commit lock runs every queued
+    transaction in order, stages their changes (so later ones see earlier
+    ones) and makes the whole group durable with one ``store.commit()``.
+    Concurrent requests therefore share a single fsync. If the commit
+    fails, the store rolls the whole group back and every transaction in it
+    gets the error.
+    """
+
+    def __init__(self, store, max_batch=256):
+        self.store = store
+        self.max_batch = max_batch
+        self._queue_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._queue = []
+
+    def submit(self, transaction):
+        pending = _Pending(transaction)
+        with self._queue_lock:
+            self._queue.append(pending)
+        while not pending.done:
+            with self._commit_lock:
+                if not pending.done:
+                    with self._queue_lock:
+                        batch = self._queue[:self.max_batch]
+                        del self._queue[:self.max_batch]
+                    self._run(batch)
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _run(self, batch):
+        staged = []
+        for pending in batch:
+            try:
+                changes, pending.result = pending.transaction()
+                self.store.stage(changes)
+                staged.append(pending)
+            except Exception as e:
+                pending.error = e
+                pending.done = True
+        try:
+            self.store.commit()
+        except Exception as e:
+            for pending in staged:
+                pending.error = e
+        for pending in staged:
+            pending.done = True